@@ -1,10 +1,28 @@
+# Waktu mulai proses, dipakai untuk mengukur durasi tiap fase startup
+import time
+STARTUP_START = time.perf_counter()
+
 from flask import Flask, request, jsonify
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array
-from PIL import Image
 from hashlib import sha256
+from batcher import MicroBatcher
+from naming import generate_image_name
+from pagination import HISTORY_PAGE_SIZE, history_query, next_page_headers, parse_limit, split_page
+from detection_stats import get_stats
+from detection_writer import WriteBehindQueue, write_detections, writer_settings
+from job_queue import JobQueue
+from blob_store import get_blob_store
+from preprocessing import load_image, image_to_array, make_thumbnail
+from inference import create_engine, configured_runtime, runtime_model_path
+from worker_pool import InferenceWorkerPool
+from prediction_cache import PredictionCache, model_version, cache_settings
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import multiprocessing
+import atexit
 import mysql.connector
+import db
 import numpy as np
+import io
 import os
 import datetime
 import logging
@@ -15,54 +33,153 @@ app = Flask(__name__)
 # Konfigurasi logging
 logging.basicConfig(level=logging.INFO)
 
-# Konfigurasi database
-DB_CONFIG = {
-    "host": "localhost",
-    "user": "root",
-    "password": "",
-    "database": "user_management"
-}
-
 # Path ke model TensorFlow
 MODEL_PATH = os.path.join(os.getcwd(), "model", "model_klasifikasirumah.h5")
 
-# Direktori sementara untuk menyimpan file gambar
-TEMP_DIR = os.path.join(os.getcwd(), "temp")
-os.makedirs(TEMP_DIR, exist_ok=True)
-
 # Label kategori kerusakan
 LABELS = ["Rusak Berat", "Rusak Menengah", "Rusak Ringan"]
 
-# Load model TensorFlow
-try:
-    model = load_model(MODEL_PATH)
-    logging.info("Model berhasil dimuat.")
-except Exception as e:
-    logging.error(f"Error saat memuat model: {e}")
-    model = None
+# Konfigurasi micro-batching inferensi
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 16))
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", 5))
+
+# Thread pool untuk decode dan resize gambar secara paralel di /predict/batch
+DECODE_WORKERS = int(os.environ.get("DECODE_WORKERS", os.cpu_count() or 4))
+decode_pool = ThreadPoolExecutor(max_workers=DECODE_WORKERS, thread_name_prefix="decode")
+
+# Mode worker pool: jumlah proses inferensi (0 = model di proses ini) dan
+# jumlah intra-op thread per proses
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", 0))
+INFERENCE_THREADS = int(os.environ.get("INFERENCE_THREADS", 1))
+# Batas waktu satu prediksi (detik) agar request tidak menunggu selamanya bila
+# worker inferensi macet atau mati
+PREDICT_TIMEOUT_S = float(os.environ.get("PREDICT_TIMEOUT_S", 30))
+
+# Muat model di background agar server langsung bisa menjawab request
+# (set BACKGROUND_MODEL_LOAD=0 untuk memuat model sebelum server berjalan)
+BACKGROUND_MODEL_LOAD = os.environ.get("BACKGROUND_MODEL_LOAD", "1") == "1"
 
-# Fungsi koneksi database
+# Durasi tiap fase startup (detik)
+startup_timings = {"import_modules": time.perf_counter() - STARTUP_START}
+
+# Engine dan batcher diisi oleh load_engine setelah model selesai dimuat
+engine = None
+batcher = None
+model_error = None
+# Antrean job prediksi asinkron (POST /jobs); worker-nya mulai setelah model siap
+job_queue = None
+
+# Fungsi prediksi satu batch gambar uint8 (N, 128, 128, 3)
+def predict_batch(img_batch):
+    if isinstance(engine, InferenceWorkerPool):
+        return engine.predict_proba(img_batch, timeout=PREDICT_TIMEOUT_S)
+    return engine.predict_proba(img_batch)
+
+# Fungsi koneksi database (diambil dari pool, lihat db.py)
 def get_connection():
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = db.get_connection()
         return conn
     except mysql.connector.Error as err:
         logging.error(f"Koneksi ke database gagal: {err}")
         return None
 
+# Cache hasil prediksi berdasarkan hash isi gambar
+_cache_settings = cache_settings()
+prediction_cache = PredictionCache(
+    model_version(runtime_model_path(MODEL_PATH, configured_runtime())),
+    max_entries=_cache_settings["max_entries"],
+    get_connection=get_connection if _cache_settings["persist"] else None
+)
+
+# Penyimpanan hasil deteksi: sinkron (default) atau write-behind di background
+# (DETECTION_WRITE_MODE=write-behind). Antrean dikosongkan saat proses berhenti.
+_writer_settings = writer_settings()
+detection_writer = None
+if _writer_settings["mode"] == "write-behind" and multiprocessing.parent_process() is None:
+    detection_writer = WriteBehindQueue(
+        get_connection,
+        max_pending=_writer_settings["max_pending"],
+        flush_rows=_writer_settings["flush_rows"],
+        flush_interval_ms=_writer_settings["flush_interval_ms"],
+        put_timeout_ms=_writer_settings["put_timeout_ms"]
+    )
+    atexit.register(detection_writer.stop)
+
+# Fungsi menyimpan baris detections: lewat antrean write-behind bila aktif dan
+# tidak penuh, selain itu langsung ke database. False bila koneksi gagal.
+def save_detection_rows(rows):
+    if detection_writer is not None and detection_writer.submit(rows):
+        return True
+    conn = get_connection()
+    if conn is None:
+        return False
+    try:
+        write_detections(conn, rows)
+        return True
+    finally:
+        conn.close()
+
+# Fungsi memuat dan warm-up model TensorFlow
+def load_engine():
+    global engine, batcher, model_error
+    try:
+        if INFERENCE_WORKERS > 0:
+            loaded = InferenceWorkerPool(MODEL_PATH, LABELS, INFERENCE_WORKERS, INFERENCE_THREADS)
+        else:
+            loaded = create_engine(MODEL_PATH, LABELS)
+        # Penjadwal yang menggabungkan permintaan /predict bersamaan menjadi satu batch;
+        # pada mode worker pool, satu batch per worker boleh berjalan bersamaan
+        batcher = MicroBatcher(
+            predict_batch, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, concurrency=max(INFERENCE_WORKERS, 1)
+        )
+        engine = loaded
+        startup_timings.update(loaded.timings)
+        startup_timings["model_ready"] = time.perf_counter() - STARTUP_START
+        logging.info(
+            "Model berhasil dimuat: "
+            + ", ".join(f"{phase}={seconds * 1000:.0f} ms" for phase, seconds in startup_timings.items())
+        )
+        if job_queue is not None:
+            job_queue.start()
+    except Exception as e:
+        model_error = str(e)
+        logging.error(f"Error saat memuat model: {e}")
+
+# Proses worker inferensi (spawn) ikut mengimpor modul ini; model hanya dimuat di proses utama
+if multiprocessing.parent_process() is None:
+    if BACKGROUND_MODEL_LOAD:
+        threading.Thread(target=load_engine, name="model-loader", daemon=True).start()
+    else:
+        load_engine()
+
 # Fungsi hash password
 def hash_password(password):
     return sha256(password.encode()).hexdigest()
 
-# Fungsi prediksi gambar
-def predict_image(image_path):
+# Fungsi decode gambar dari bytes menjadi array uint8 input model
+def decode_image(image_data):
+    return image_to_array(load_image(io.BytesIO(image_data)))
+
+# Fungsi menyimpan gambar ke blob store dan membuat thumbnail-nya.
+# Database hanya menyimpan hash gambar dan thumbnail kecil untuk riwayat.
+def store_image(image_data):
+    return get_blob_store().put(image_data), make_thumbnail(image_data)
+
+# Fungsi prediksi gambar dari bytes hasil unggahan
+def predict_image(image_data):
     try:
-        img = Image.open(image_path).resize((128, 128))
-        img_array = img_to_array(img) / 255.0
-        img_array = np.expand_dims(img_array, axis=0)
-        predictions = model.predict(img_array)
-        predicted_index = np.argmax(predictions)
-        confidence = predictions[0][predicted_index] * 100
+        cache_key = prediction_cache.make_key(image_data)
+        cached = prediction_cache.get(cache_key)
+        if cached is not None:
+            predicted_index, confidence = cached
+            return LABELS[predicted_index], confidence
+
+        img_array = decode_image(image_data)
+        predictions = batcher.submit(img_array, timeout=PREDICT_TIMEOUT_S)
+        predicted_index = int(np.argmax(predictions))
+        confidence = float(predictions[predicted_index]) * 100
+        prediction_cache.put(cache_key, predicted_index, confidence)
         label = LABELS[predicted_index]
         return label, confidence
     except Exception as e:
@@ -78,7 +195,13 @@ def home():
             "/register": "POST - Registrasi pengguna baru",
             "/login": "POST - Login pengguna",
             "/predict": "POST - Prediksi kerusakan berdasarkan gambar",
-            "/history": "GET - Lihat riwayat deteksi pengguna"
+            "/predict/batch": "POST - Prediksi banyak gambar dalam satu permintaan",
+            "/history": f"GET - Riwayat deteksi pengguna, terbaru dulu, maksimal limit (default {HISTORY_PAGE_SIZE}) baris; halaman berikutnya lewat header X-Next-Cursor/Link (parameter cursor)",
+            "/stats": "GET - Statistik deteksi pengguna per kategori",
+            "/metrics": "GET - Statistik antrean, ukuran batch, dan cache prediksi",
+            "/jobs": "POST - Antrekan prediksi gambar, hasilnya diambil lewat /jobs/<id>",
+            "/jobs/<id>": "GET - Status dan hasil job prediksi",
+            "/ready": "GET - Status kesiapan model untuk inferensi"
         }
     })
 
@@ -154,41 +277,28 @@ def predict():
     if not file.content_type.startswith('image/'):
         return jsonify({"error": "File bukan gambar"}), 400
 
+    if engine is None:
+        return jsonify({"error": "Model belum siap"}), 503
+
     # Generate unique file name
-    timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-    unique_id = sha256(f"{email}{timestamp}".encode()).hexdigest()[:8]
-    image_name = f"img_{unique_id}.png"
+    image_name = generate_image_name()
 
-    # Simpan file gambar sementara
-    file_path = os.path.join(TEMP_DIR, image_name)
     try:
-        file.save(file_path)
-        logging.info(f"File berhasil disimpan di {file_path}")
+        # Baca stream unggahan sekali ke memori; bytes yang sama dipakai untuk
+        # prediksi dan disimpan sebagai blob tanpa menulis ke disk
+        image_data = file.read()
 
         # Prediksi kerusakan menggunakan model
-        label, confidence = predict_image(file_path)
+        label, confidence = predict_image(image_data)
         if label is None:
             raise Exception("Gagal memproses gambar")
 
-        # Baca data gambar sebagai blob
-        with open(file_path, "rb") as img_file:
-            image_data = img_file.read()
+        # Simpan gambar ke blob store beserta thumbnail-nya
+        image_hash, thumbnail = store_image(image_data)
 
         # Simpan hasil prediksi ke database
-        conn = get_connection()
-        if conn:
-            cursor = conn.cursor()
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cursor.execute(
-                """
-                INSERT INTO detections (email, label, confidence, timestamp, image_name, image_data)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """,
-                (email, label, confidence, timestamp, image_name, image_data)
-            )
-            conn.commit()
-            cursor.close()
-            conn.close()
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        save_detection_rows([(email, label, confidence, timestamp, image_name, image_hash, thumbnail)])
 
         return jsonify({
             "label": label,
@@ -198,9 +308,149 @@ def predict():
     except Exception as e:
         logging.error(f"Error: {e}")
         return jsonify({"error": str(e)}), 500
-    finally:
-        if os.path.exists(file_path):
-            os.remove(file_path)
+
+# Endpoint: Prediksi banyak gambar sekaligus
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch_endpoint():
+    files = request.files.getlist('files')
+    email = request.form.get('email')
+
+    if not files:
+        return jsonify({"error": "Tidak ada file yang diunggah"}), 400
+
+    if not email:
+        return jsonify({"error": "Email harus disertakan"}), 400
+
+    if engine is None:
+        return jsonify({"error": "Model belum siap"}), 503
+
+    # Validasi dan baca setiap file ke memori
+    results = [None] * len(files)
+    uploads = []
+    for index, file in enumerate(files):
+        if file.filename == '':
+            results[index] = {"file": file.filename, "error": "Nama file kosong"}
+        elif not file.content_type or not file.content_type.startswith('image/'):
+            results[index] = {"file": file.filename, "error": "File bukan gambar"}
+        else:
+            uploads.append((index, file.filename, file.read()))
+
+    # Gunakan hasil cache bila tersedia, sisanya di-decode dan di-resize secara paralel
+    predicted = []
+    pending = []
+    for index, filename, image_data in uploads:
+        cache_key = prediction_cache.make_key(image_data)
+        cached = prediction_cache.get(cache_key)
+        if cached is not None:
+            predicted.append((index, filename, image_data, cached[0], cached[1]))
+        else:
+            pending.append((index, filename, image_data, cache_key))
+
+    futures = [decode_pool.submit(decode_image, image_data) for _, _, image_data, _ in pending]
+    decoded = []
+    for (index, filename, image_data, cache_key), future in zip(pending, futures):
+        try:
+            decoded.append((index, filename, image_data, cache_key, future.result()))
+        except Exception as e:
+            logging.error(f"Gagal membaca gambar {filename}: {e}")
+            results[index] = {"file": filename, "error": "Gagal memproses gambar"}
+
+    try:
+        if decoded:
+            # Satu pemanggilan model untuk seluruh gambar
+            predictions = predict_batch(np.stack([img_array for _, _, _, _, img_array in decoded]))
+            for (index, filename, image_data, cache_key, _), prediction in zip(decoded, predictions):
+                predicted_index = int(np.argmax(prediction))
+                confidence = float(prediction[predicted_index]) * 100
+                prediction_cache.put(cache_key, predicted_index, confidence)
+                predicted.append((index, filename, image_data, predicted_index, confidence))
+
+        # Simpan gambar ke blob store dan buat thumbnail secara paralel
+        predicted.sort(key=lambda item: item[0])
+        stored_images = list(decode_pool.map(store_image, [item[2] for item in predicted]))
+
+        rows = []
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for (index, filename, _, predicted_index, confidence), (image_hash, thumbnail) in zip(predicted, stored_images):
+            label = LABELS[predicted_index]
+            image_name = generate_image_name()
+            rows.append((email, label, confidence, timestamp, image_name, image_hash, thumbnail))
+            results[index] = {
+                "file": filename,
+                "label": label,
+                "confidence": round(confidence, 2),
+                "image_name": image_name
+            }
+
+        # Simpan semua hasil dalam satu transaksi
+        if rows:
+            try:
+                if not save_detection_rows(rows):
+                    return jsonify({"error": "Koneksi database gagal"}), 500
+            except mysql.connector.Error as err:
+                return jsonify({"error": f"Gagal menyimpan data: {err}"}), 500
+
+        return jsonify({"results": results}), 200
+    except Exception as e:
+        logging.error(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+# Fungsi memproses satu job prediksi (dijalankan worker job_queue). Gambar
+# sudah ada di blob store sejak job diterima, sehingga job tetap bisa
+# diproses setelah server restart.
+def process_prediction_job(payload):
+    image_data = get_blob_store().get(payload["image_hash"])
+    label, confidence = predict_image(image_data)
+    if label is None:
+        raise Exception("Gagal memproses gambar")
+
+    image_name = generate_image_name()
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    row = (payload["email"], label, confidence, timestamp, image_name, payload["image_hash"], make_thumbnail(image_data))
+    if not save_detection_rows([row]):
+        raise Exception("Koneksi database gagal")
+    return {
+        "file": payload["filename"],
+        "label": label,
+        "confidence": round(confidence, 2),
+        "image_name": image_name
+    }
+
+# Endpoint: Antrekan prediksi gambar (langsung mengembalikan id job)
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    if 'file' not in request.files:
+        return jsonify({"error": "Tidak ada file yang diunggah"}), 400
+
+    file = request.files['file']
+    email = request.form.get('email')
+
+    if not email:
+        return jsonify({"error": "Email harus disertakan"}), 400
+
+    if file.filename == '':
+        return jsonify({"error": "Nama file kosong"}), 400
+
+    if not file.content_type or not file.content_type.startswith('image/'):
+        return jsonify({"error": "File bukan gambar"}), 400
+
+    if job_queue is None:
+        return jsonify({"error": "Antrean job tidak tersedia"}), 503
+
+    image_hash = get_blob_store().put(file.read())
+    job_id = job_queue.enqueue({"email": email, "filename": file.filename, "image_hash": image_hash})
+    return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}), 202
+
+# Endpoint: Status dan hasil job prediksi
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    if job_queue is None:
+        return jsonify({"error": "Antrean job tidak tersedia"}), 503
+
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job tidak ditemukan"}), 404
+    return jsonify(job), 200
 
 # Endpoint: Riwayat deteksi
 @app.route('/history', methods=['GET'])
@@ -209,22 +459,81 @@ def get_history():
     if not email:
         return jsonify({"error": "Email harus disertakan"}), 400
 
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        query, params = history_query("id, label, confidence, timestamp, image_name", email, limit, request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     conn = get_connection()
     if conn:
         cursor = conn.cursor(dictionary=True)
         try:
-            cursor.execute("SELECT id, label, confidence, timestamp, image_name FROM detections WHERE email = %s ORDER BY timestamp DESC", (email,))
-            results = cursor.fetchall()
-            return jsonify(results), 200
+            cursor.execute(query, params)
+            items, next_cursor = split_page(cursor.fetchall(), limit)
+            return jsonify(items), 200, next_page_headers(request.base_url, email, limit, next_cursor)
         finally:
             cursor.close()
             conn.close()
     else:
         return jsonify({"error": "Koneksi database gagal"}), 500
 
+# Endpoint: Statistik deteksi (dibaca dari rollup detection_stats)
+@app.route('/stats', methods=['GET'])
+def get_detection_stats():
+    email = request.args.get('email')
+    if not email:
+        return jsonify({"error": "Email harus disertakan"}), 400
+
+    conn = get_connection()
+    if conn:
+        try:
+            return jsonify(get_stats(conn, email)), 200
+        finally:
+            conn.close()
+    else:
+        return jsonify({"error": "Koneksi database gagal"}), 500
+
+# Endpoint: Kesiapan model
+@app.route('/ready', methods=['GET'])
+def ready():
+    timings_ms = {phase: round(seconds * 1000, 1) for phase, seconds in startup_timings.items()}
+    if engine is not None:
+        return jsonify({"ready": True, "runtime": engine.runtime, "startup_ms": timings_ms}), 200
+    status = "error" if model_error else "loading"
+    return jsonify({"ready": False, "status": status, "error": model_error, "startup_ms": timings_ms}), 503
+
+# Endpoint: Statistik inferensi
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    if batcher is None:
+        return jsonify({"error": "Model belum siap"}), 503
+    metrics = {"batcher": batcher.stats(), "prediction_cache": prediction_cache.stats()}
+    if detection_writer is not None:
+        metrics["write_behind"] = detection_writer.stats()
+    if job_queue is not None:
+        metrics["jobs"] = job_queue.stats()
+    if isinstance(engine, InferenceWorkerPool):
+        metrics["worker_pool"] = {
+            "workers": engine.num_workers,
+            "queue_depth": engine.queue_depth(),
+            "restarts": engine.restarts,
+        }
+    return jsonify(metrics), 200
+
+# Job yang tersimpan dari proses sebelumnya langsung diproses bila model sudah siap
+if multiprocessing.parent_process() is None:
+    job_queue = JobQueue(handler=process_prediction_job)
+    atexit.register(job_queue.stop)
+    if engine is not None:
+        job_queue.start()
+
+startup_timings["server_ready"] = time.perf_counter() - STARTUP_START
+logging.info(f"Aplikasi siap menerima request dalam {startup_timings['server_ready'] * 1000:.0f} ms")
+
 # Jalankan aplikasi Flask
 if __name__ == '__main__':
-    if model is None:
+    if not BACKGROUND_MODEL_LOAD and engine is None:
         logging.error("Gagal memulai API karena model tidak dimuat.")
     else:
         app.run(debug=True)
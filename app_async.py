@@ -0,0 +1,307 @@
+# Varian ASGI dari API (app.py) dengan kontrak endpoint yang sama.
+# Akses database memakai pool aiomysql, decode yang CPU-bound dijalankan di
+# executor terbatas, dan hasil micro-batch inferensi ditunggu di event loop,
+# sehingga event loop tidak pernah terblokir oleh unggahan lambat atau model.
+#
+# Jalankan dengan: hypercorn app_async:app --bind 0.0.0.0:5000
+from quart import Quart, request, jsonify
+from hashlib import sha256
+from batcher import MicroBatcher
+from naming import generate_image_name
+from pagination import HISTORY_PAGE_SIZE, history_query, next_page_headers, parse_limit, split_page
+from detection_stats import SELECT_QUERY, UPSERT_QUERY, rollup_params, summarize
+from blob_store import get_blob_store
+from preprocessing import load_image, image_to_array, make_thumbnail
+from inference import create_engine, configured_runtime, runtime_model_path
+from prediction_cache import PredictionCache, model_version, cache_settings
+from concurrent.futures import ThreadPoolExecutor
+import aiomysql
+import asyncio
+import numpy as np
+import io
+import os
+import datetime
+import logging
+
+# Inisialisasi Quart
+app = Quart(__name__)
+
+# Konfigurasi logging
+logging.basicConfig(level=logging.INFO)
+
+# Konfigurasi database
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",
+    "db": "user_management"
+}
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+
+# Path ke model TensorFlow
+MODEL_PATH = os.path.join(os.getcwd(), "model", "model_klasifikasirumah.h5")
+
+# Label kategori kerusakan
+LABELS = ["Rusak Berat", "Rusak Menengah", "Rusak Ringan"]
+
+# Konfigurasi micro-batching inferensi
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 16))
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", 5))
+# Batas waktu satu prediksi (detik), sama dengan app.py
+PREDICT_TIMEOUT_S = float(os.environ.get("PREDICT_TIMEOUT_S", 30))
+
+# Executor terbatas untuk pekerjaan CPU-bound (decode, thumbnail). Jumlah
+# pekerjaan yang menunggu dibatasi semaphore agar memori tetap terkendali saat
+# ribuan unggahan datang bersamaan.
+CPU_WORKERS = int(os.environ.get("CPU_WORKERS", os.cpu_count() or 4))
+CPU_QUEUE_LIMIT = int(os.environ.get("CPU_QUEUE_LIMIT", 256))
+cpu_executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="cpu")
+cpu_slots = None
+
+# Diisi saat startup server
+db_pool = None
+engine = None
+batcher = None
+
+# Cache hasil prediksi berdasarkan hash isi gambar
+_cache_settings = cache_settings()
+prediction_cache = PredictionCache(
+    model_version(runtime_model_path(MODEL_PATH, configured_runtime())),
+    max_entries=_cache_settings["max_entries"]
+)
+
+# Fungsi hash password
+def hash_password(password):
+    return sha256(password.encode()).hexdigest()
+
+# Fungsi cek cache lalu decode gambar dari bytes (dijalankan di executor).
+# Mengembalikan (cache_key, hasil cache atau None, array input atau None).
+def decode_uncached(image_data):
+    cache_key = prediction_cache.make_key(image_data)
+    cached = prediction_cache.get(cache_key)
+    if cached is not None:
+        return cache_key, cached, None
+    return cache_key, None, image_to_array(load_image(io.BytesIO(image_data)))
+
+# Fungsi prediksi gambar dari bytes. Hanya decode yang memakai thread executor;
+# hasil micro-batch ditunggu di event loop sehingga ukuran batch tidak dibatasi
+# jumlah thread executor.
+async def predict_image(image_data):
+    cache_key, cached, img_array = await run_cpu_bound(decode_uncached, image_data)
+    if cached is not None:
+        predicted_index, confidence = cached
+        return LABELS[predicted_index], confidence
+
+    future = batcher.submit_future(img_array)
+    try:
+        predictions = await asyncio.wait_for(asyncio.wrap_future(future), PREDICT_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        raise TimeoutError("Prediksi melebihi batas waktu")
+    predicted_index = int(np.argmax(predictions))
+    confidence = float(predictions[predicted_index]) * 100
+    prediction_cache.put(cache_key, predicted_index, confidence)
+    return LABELS[predicted_index], confidence
+
+# Fungsi menyimpan gambar ke blob store dan membuat thumbnail-nya (dijalankan di executor)
+def store_image(image_data):
+    return get_blob_store().put(image_data), make_thumbnail(image_data)
+
+# Jalankan fungsi CPU-bound di executor dengan batas antrean
+async def run_cpu_bound(fn, *args):
+    async with cpu_slots:
+        return await asyncio.get_running_loop().run_in_executor(cpu_executor, fn, *args)
+
+# Fungsi memuat dan warm-up model TensorFlow
+def load_engine():
+    global engine, batcher
+    loaded = create_engine(MODEL_PATH, LABELS)
+    batcher = MicroBatcher(loaded.predict_proba, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS)
+    engine = loaded
+    logging.info("Model berhasil dimuat.")
+
+async def load_engine_in_background():
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, load_engine)
+    except Exception as e:
+        logging.error(f"Error saat memuat model: {e}")
+
+@app.before_serving
+async def startup():
+    global db_pool, cpu_slots
+    cpu_slots = asyncio.Semaphore(CPU_QUEUE_LIMIT)
+    db_pool = await aiomysql.create_pool(minsize=1, maxsize=DB_POOL_SIZE, autocommit=False, **DB_CONFIG)
+    app.add_background_task(load_engine_in_background)
+
+@app.after_serving
+async def shutdown():
+    db_pool.close()
+    await db_pool.wait_closed()
+    if batcher is not None:
+        batcher.stop()
+    cpu_executor.shutdown(wait=False)
+
+# Endpoint: Home (dokumentasi API)
+@app.route('/', methods=['GET'])
+async def home():
+    return jsonify({
+        "message": "Selamat datang di API Sistem Deteksi Kerusakan Bangunan",
+        "endpoints": {
+            "/register": "POST - Registrasi pengguna baru",
+            "/login": "POST - Login pengguna",
+            "/predict": "POST - Prediksi kerusakan berdasarkan gambar",
+            "/history": f"GET - Riwayat deteksi pengguna, terbaru dulu, maksimal limit (default {HISTORY_PAGE_SIZE}) baris; halaman berikutnya lewat header X-Next-Cursor/Link (parameter cursor)",
+            "/stats": "GET - Statistik deteksi pengguna per kategori",
+            "/ready": "GET - Status kesiapan model untuk inferensi"
+        }
+    })
+
+# Endpoint: Register pengguna baru
+@app.route('/register', methods=['POST'])
+async def register_user():
+    data = await request.get_json()
+    email = data.get('email')
+    password = data.get('password')
+
+    if not email or not password:
+        return jsonify({"error": "Email dan password harus diisi"}), 400
+
+    hashed_password = hash_password(password)
+    try:
+        async with db_pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("INSERT INTO users (email, password) VALUES (%s, %s)", (email, hashed_password))
+            await conn.commit()
+        return jsonify({"message": "Pendaftaran berhasil"}), 201
+    except aiomysql.Error as err:
+        return jsonify({"error": f"Gagal menyimpan data: {err}"}), 500
+
+# Endpoint: Login pengguna
+@app.route('/login', methods=['POST'])
+async def login_user():
+    data = await request.get_json()
+    email = data.get('email')
+    password = data.get('password')
+
+    if not email or not password:
+        return jsonify({"error": "Email dan password harus diisi"}), 400
+
+    hashed_password = hash_password(password)
+    try:
+        async with db_pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute("SELECT * FROM users WHERE email = %s AND password = %s", (email, hashed_password))
+                user = await cursor.fetchone()
+    except aiomysql.Error:
+        return jsonify({"error": "Koneksi database gagal"}), 500
+
+    if user:
+        return jsonify({"message": "Login berhasil"}), 200
+    return jsonify({"error": "Email atau password salah"}), 401
+
+# Endpoint: Prediksi gambar
+@app.route('/predict', methods=['POST'])
+async def predict():
+    files = await request.files
+    form = await request.form
+    if 'file' not in files:
+        logging.error("Key 'file' tidak ditemukan di request.files")
+        return jsonify({"error": "Tidak ada file yang diunggah"}), 400
+
+    file = files['file']
+    email = form.get('email')
+
+    if not email:
+        return jsonify({"error": "Email harus disertakan"}), 400
+
+    if file.filename == '':
+        return jsonify({"error": "Nama file kosong"}), 400
+
+    if not file.content_type.startswith('image/'):
+        return jsonify({"error": "File bukan gambar"}), 400
+
+    if engine is None:
+        return jsonify({"error": "Model belum siap"}), 503
+
+    # Generate unique file name
+    image_name = generate_image_name()
+
+    try:
+        image_data = file.read()
+
+        # Decode di executor, inferensi lewat micro-batch tanpa menahan thread
+        label, confidence = await predict_image(image_data)
+
+        # Simpan gambar ke blob store beserta thumbnail-nya
+        image_hash, thumbnail = await run_cpu_bound(store_image, image_data)
+
+        # Simpan hasil prediksi ke database
+        async with db_pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                await cursor.execute(
+                    """
+                    INSERT INTO detections (email, label, confidence, timestamp, image_name, image_hash, thumbnail)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    """,
+                    (email, label, confidence, timestamp, image_name, image_hash, thumbnail)
+                )
+                await cursor.executemany(UPSERT_QUERY, rollup_params([(email, label, confidence)]))
+            await conn.commit()
+
+        return jsonify({
+            "label": label,
+            "confidence": round(confidence, 2),
+            "image_name": image_name
+        }), 200
+    except Exception as e:
+        logging.error(f"Error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+# Endpoint: Riwayat deteksi
+@app.route('/history', methods=['GET'])
+async def get_history():
+    email = request.args.get('email')
+    if not email:
+        return jsonify({"error": "Email harus disertakan"}), 400
+
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        query, params = history_query("id, label, confidence, timestamp, image_name", email, limit, request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        async with db_pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params)
+                items, next_cursor = split_page(await cursor.fetchall(), limit)
+        return jsonify(items), 200, next_page_headers(request.base_url, email, limit, next_cursor)
+    except aiomysql.Error:
+        return jsonify({"error": "Koneksi database gagal"}), 500
+
+# Endpoint: Statistik deteksi (dibaca dari rollup detection_stats)
+@app.route('/stats', methods=['GET'])
+async def get_detection_stats():
+    email = request.args.get('email')
+    if not email:
+        return jsonify({"error": "Email harus disertakan"}), 400
+
+    try:
+        async with db_pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(SELECT_QUERY, (email,))
+                rows = await cursor.fetchall()
+        return jsonify(summarize(rows)), 200
+    except aiomysql.Error:
+        return jsonify({"error": "Koneksi database gagal"}), 500
+
+# Endpoint: Kesiapan model
+@app.route('/ready', methods=['GET'])
+async def ready():
+    if engine is not None:
+        return jsonify({"ready": True, "runtime": engine.runtime}), 200
+    return jsonify({"ready": False, "status": "loading"}), 503
+
+# Jalankan aplikasi Quart (untuk pengembangan; produksi memakai hypercorn)
+if __name__ == '__main__':
+    app.run(debug=True)
@@ -0,0 +1,172 @@
+import threading
+import queue
+import time
+import logging
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+
+# Satu permintaan prediksi yang menunggu hasil dari batch. `future` diisi bila
+# pemanggil menunggu lewat Future (submit_future), bukan memblokir thread.
+class _PendingRequest:
+    __slots__ = ("inputs", "done", "result", "error", "future")
+
+    def __init__(self, inputs, future=None):
+        self.inputs = inputs
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.future = future
+
+
+# Penjadwal inferensi yang mengumpulkan permintaan bersamaan menjadi satu batch.
+# `predict_fn` menerima array (N, ...) dan mengembalikan array (N, jumlah_kelas).
+# Dengan `concurrency` > 1, beberapa batch boleh diproses bersamaan (mis. saat
+# `predict_fn` meneruskan batch ke pool proses worker).
+class MicroBatcher:
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=5, concurrency=1):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size minimal 1")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._last_batch_size = 0
+        self._total_requests = 0
+
+        self._executor = None
+        if concurrency > 1:
+            self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="micro-batch")
+            # Batasi batch yang sedang diproses agar antrean tetap terkumpul menjadi batch
+            self._in_flight = threading.BoundedSemaphore(concurrency)
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    # Kirim satu sampel dan tunggu hasil prediksinya
+    def submit(self, inputs, timeout=None):
+        if not self._running:
+            raise RuntimeError("Batcher sudah dihentikan")
+        pending = _PendingRequest(inputs)
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            raise TimeoutError("Prediksi melebihi batas waktu")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    # Kirim satu sampel tanpa menunggu; hasilnya diisi ke Future yang dikembalikan.
+    # Dipakai pemanggil async (asyncio.wrap_future) agar tidak menahan thread.
+    def submit_future(self, inputs):
+        if not self._running:
+            raise RuntimeError("Batcher sudah dihentikan")
+        future = Future()
+        self._queue.put(_PendingRequest(inputs, future))
+        return future
+
+    # Jumlah permintaan yang sedang menunggu di antrean
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    # Ringkasan statistik batch
+    def stats(self):
+        with self._stats_lock:
+            total_batches = sum(self._batch_sizes.values())
+            return {
+                "queue_depth": self.queue_depth(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "total_batches": total_batches,
+                "total_requests": self._total_requests,
+                "last_batch_size": self._last_batch_size,
+                "avg_batch_size": self._total_requests / total_batches if total_batches else 0.0,
+                "batch_size_histogram": {str(size): count for size, count in sorted(self._batch_sizes.items())},
+            }
+
+    # Hentikan thread penjadwal setelah antrean dikosongkan
+    def stop(self, timeout=None):
+        self._running = False
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _collect_batch(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Sinyal berhenti: proses batch terakhir lalu keluar
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                self._drain()
+                break
+            batch = self._collect_batch(first)
+            self._dispatch(batch)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def _dispatch(self, batch):
+        if self._executor is None:
+            self._process(batch)
+            return
+        self._in_flight.acquire()
+        future = self._executor.submit(self._process, batch)
+        future.add_done_callback(lambda _: self._in_flight.release())
+
+    # Selesaikan sisa permintaan di antrean sebelum thread berhenti
+    def _drain(self):
+        remaining = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                remaining.append(item)
+        for start in range(0, len(remaining), self.max_batch_size):
+            self._dispatch(remaining[start:start + self.max_batch_size])
+
+    def _process(self, batch):
+        depth = self.queue_depth()
+        with self._stats_lock:
+            self._batch_sizes[len(batch)] += 1
+            self._last_batch_size = len(batch)
+            self._total_requests += len(batch)
+        logging.debug(f"Batch inferensi: ukuran={len(batch)}, antrean={depth}")
+
+        try:
+            inputs = np.stack([item.inputs for item in batch])
+            outputs = self.predict_fn(inputs)
+            for item, output in zip(batch, outputs):
+                item.result = output
+        except Exception as e:
+            logging.error(f"Error saat memproses batch: {e}")
+            for item in batch:
+                item.error = e
+        finally:
+            for item in batch:
+                item.done.set()
+                if item.future is not None and item.future.set_running_or_notify_cancel():
+                    if item.error is not None:
+                        item.future.set_exception(item.error)
+                    else:
+                        item.future.set_result(item.result)
@@ -0,0 +1,94 @@
+"""Benchmark EDA dataset: tiga lintasan serial notebook vs. dataset_profile.py.
+
+Jalur lama membuka setiap gambar tiga kali secara berurutan (ukuran, rata-rata
+warna, distribusi dimensi). Profiler membaca setiap file sekali di process pool;
+lintasan kedua memakai file statistik yang sudah ada, dan lintasan ketiga
+memindai ulang satu file yang diubah.
+
+    python benchmarks/bench_dataset_profile.py [--data dataset_gambar] [--workers N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataset_profile import profile_dataset  # noqa: E402
+
+VALID_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+# Sama dengan tiga sel EDA sebelumnya di klasifikasi_rumah_rusak.py
+def notebook_passes(data_path):
+    categories = sorted(name for name in os.listdir(data_path) if os.path.isdir(os.path.join(data_path, name)))
+    image_sizes, average_colors, dimensions = {}, {}, {}
+    for category in categories:
+        folder_path = os.path.join(data_path, category)
+        sizes = []
+        for img_file in os.listdir(folder_path):
+            if img_file.lower().endswith(VALID_EXTENSIONS):
+                with Image.open(os.path.join(folder_path, img_file)) as img:
+                    sizes.append(img.size)
+        image_sizes[category] = sizes
+    for category in categories:
+        folder_path = os.path.join(data_path, category)
+        colors = []
+        for img_file in os.listdir(folder_path):
+            if img_file.lower().endswith(VALID_EXTENSIONS):
+                with Image.open(os.path.join(folder_path, img_file)) as img:
+                    colors.append(np.array(img).mean(axis=(0, 1)))
+        average_colors[category] = colors
+    for category in categories:
+        folder_path = os.path.join(data_path, category)
+        dims = []
+        for img_file in os.listdir(folder_path):
+            if img_file.lower().endswith(VALID_EXTENSIONS):
+                with Image.open(os.path.join(folder_path, img_file)) as img:
+                    dims.append(img.size)
+        dimensions[category] = Counter(dims)
+    return image_sizes, average_colors, dimensions
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run(data_path, workers):
+    _, elapsed = timed(notebook_passes, data_path)
+    print(f"{'3 lintasan serial':>24}: {elapsed * 1000:8.1f} ms")
+    baseline = elapsed
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stats_path = os.path.join(tmp, "dataset_profile.csv")
+        (rows, scanned), elapsed = timed(profile_dataset, data_path, stats_path, workers)
+        print(f"{'profiler (cache kosong)':>24}: {elapsed * 1000:8.1f} ms, {scanned} dipindai, "
+              f"{baseline / elapsed:.1f}x")
+        (rows, scanned), elapsed = timed(profile_dataset, data_path, stats_path, workers)
+        print(f"{'profiler (cache penuh)':>24}: {elapsed * 1000:8.1f} ms, {scanned} dipindai, "
+              f"{baseline / elapsed:.1f}x")
+
+        # Ubah mtime satu file (isi tetap) agar dipindai ulang
+        path = os.path.join(data_path, rows[0]["path"])
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        try:
+            (rows, scanned), elapsed = timed(profile_dataset, data_path, stats_path, workers)
+        finally:
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        print(f"{'profiler (1 file berubah)':>24}: {elapsed * 1000:8.1f} ms, {scanned} dipindai, "
+              f"{baseline / elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default="dataset_gambar")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    run(args.data, args.workers)
@@ -0,0 +1,133 @@
+"""Benchmark latensi per request: koneksi baru per request vs. koneksi dari pool.
+
+Backend ``mysql`` memakai DB_CONFIG di db.py (MySQL/MariaDB lokal dengan skema
+user_management.sql). Selain manfaat pool, backend ini mengukur terpisah biaya
+cursor prepared yang dibuat per request (prepare + execute + close) dibanding
+cursor biasa pada koneksi pool yang sama. Backend ``sqlite`` adalah stand-in
+tanpa server: setiap "koneksi baru" membuka file database dan membaca skemanya,
+sedangkan pool memakai ulang koneksi yang sudah terbuka.
+
+    python benchmarks/bench_db_pool.py [--backend mysql|sqlite] [--requests 500] [--threads 4]
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LOGIN_QUERY = "SELECT * FROM users WHERE email = %s AND password = %s"
+EMAIL = "benchmark@example.com"
+PASSWORD = "0" * 64
+
+
+def mysql_backend():
+    import mysql.connector
+    import db
+
+    conn = mysql.connector.connect(**db.DB_CONFIG)
+    cursor = conn.cursor()
+    cursor.execute("INSERT IGNORE INTO users (email, password) VALUES (%s, %s)", (EMAIL, PASSWORD))
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+    def per_request():
+        conn = mysql.connector.connect(**db.DB_CONFIG)
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(LOGIN_QUERY, (EMAIL, PASSWORD))
+        cursor.fetchone()
+        cursor.close()
+        conn.close()
+
+    def pooled(prepared=False):
+        conn = db.get_connection()
+        cursor = conn.cursor(dictionary=True, prepared=prepared)
+        cursor.execute(LOGIN_QUERY, (EMAIL, PASSWORD))
+        cursor.fetchone()
+        cursor.close()
+        conn.close()
+
+    return {
+        "koneksi baru": per_request,
+        "pool": pooled,
+        "pool + prepared": lambda: pooled(prepared=True),
+    }, lambda: None
+
+
+def sqlite_backend(pool_size):
+    directory = tempfile.TemporaryDirectory()
+    path = os.path.join(directory.name, "user_management.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT UNIQUE, password TEXT)")
+    conn.execute("INSERT INTO users (email, password) VALUES (?, ?)", (EMAIL, PASSWORD))
+    conn.commit()
+    conn.close()
+    query = LOGIN_QUERY.replace("%s", "?")
+
+    def per_request():
+        conn = sqlite3.connect(path)
+        conn.execute(query, (EMAIL, PASSWORD)).fetchone()
+        conn.close()
+
+    pool = queue.Queue()
+    for _ in range(pool_size):
+        pool.put(sqlite3.connect(path, check_same_thread=False))
+
+    def pooled():
+        conn = pool.get()
+        try:
+            conn.execute(query, (EMAIL, PASSWORD)).fetchone()
+        finally:
+            pool.put(conn)
+
+    return {"koneksi baru": per_request, "pool": pooled}, directory.cleanup
+
+
+def measure(fn, requests, threads):
+    def timed(_):
+        start = time.perf_counter()
+        fn()
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(timed, range(min(requests, 20))))  # pemanasan
+        timings = np.array(list(executor.map(timed, range(requests))))
+    return np.percentile(timings, 50), np.percentile(timings, 99), timings.mean()
+
+
+def run(backend, requests, threads):
+    if backend == "mysql":
+        variants, cleanup = mysql_backend()
+    else:
+        variants, cleanup = sqlite_backend(threads)
+
+    try:
+        print(f"Backend: {backend}, {requests} request, {threads} thread")
+        results = {}
+        for name, fn in variants.items():
+            results[name] = measure(fn, requests, threads)
+            p50, p99, mean = results[name]
+            print(f"{name:>15}: p50 {p50:7.3f} ms, p99 {p99:7.3f} ms, rata-rata {mean:7.3f} ms")
+        saved = results["koneksi baru"][2] - results["pool"][2]
+        print(f"Latensi dihemat pool per request: {saved:.3f} ms")
+        if "pool + prepared" in results:
+            extra = results["pool + prepared"][2] - results["pool"][2]
+            print(f"Biaya tambahan cursor prepared per request: {extra:.3f} ms")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="sqlite")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+    run(args.backend, args.requests, args.threads)
@@ -0,0 +1,107 @@
+"""Benchmark halaman riwayat: gambar penuh per baris vs. thumbnail saja.
+
+Jalur lama mengambil ``image_data`` (PNG ukuran penuh) untuk setiap baris dan
+men-decode semuanya, termasuk expander yang tertutup. Jalur baru hanya
+mengambil ``thumbnail`` JPEG kecil; gambar penuh dimuat saat dibuka. Database
+yang dipakai adalah SQLite sementara sebagai stand-in tabel detections.
+
+    python benchmarks/bench_history_page.py [--dataset dataset_gambar] [--rows 200] [--repeat 3]
+"""
+import argparse
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from preprocessing import make_thumbnail  # noqa: E402
+
+VALID_EXTENSIONS = (".jpg", ".jpeg", ".png")
+EMAIL = "benchmark@example.com"
+
+
+def list_images(dataset_path):
+    paths = []
+    for root, _, files in os.walk(dataset_path):
+        for name in sorted(files):
+            if name.lower().endswith(VALID_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+# Simpan setiap gambar seperti main.py: blob PNG dan thumbnail
+def build_database(path, image_paths, rows):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE detections (id INTEGER PRIMARY KEY, email TEXT, label TEXT, confidence REAL, "
+        "timestamp TEXT, image_data BLOB, thumbnail BLOB, image_name TEXT)"
+    )
+    for index in range(rows):
+        with open(image_paths[index % len(image_paths)], "rb") as f:
+            image_bytes = f.read()
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            png = io.BytesIO()
+            image.save(png, format="PNG")
+        conn.execute(
+            "INSERT INTO detections (email, label, confidence, timestamp, image_data, thumbnail, image_name) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (EMAIL, "Rusak Ringan", 90.0, f"2024-01-01 00:00:{index % 60:02d}", png.getvalue(),
+             make_thumbnail(image_bytes), f"img_{index}")
+        )
+    conn.commit()
+    conn.close()
+
+
+# Render satu halaman riwayat: ambil baris lalu decode kolom gambar yang dipilih
+def render_page(path, column):
+    conn = sqlite3.connect(path)
+    transferred = 0
+    try:
+        rows = conn.execute(
+            f"SELECT id, label, confidence, timestamp, {column}, image_name FROM detections "
+            "WHERE email = ? ORDER BY timestamp DESC",
+            (EMAIL,)
+        ).fetchall()
+        for row in rows:
+            blob = row[4]
+            transferred += len(blob)
+            with Image.open(io.BytesIO(blob)) as img:
+                img.load()
+    finally:
+        conn.close()
+    return transferred
+
+
+def run(dataset_path, rows, repeat):
+    image_paths = list_images(dataset_path)
+    if not image_paths:
+        raise SystemExit(f"Tidak ada gambar di {dataset_path}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "history.db")
+        build_database(path, image_paths, rows)
+
+        print(f"Riwayat: {rows} baris, {repeat} pengulangan")
+        results = {}
+        for name, column in (("gambar penuh", "image_data"), ("thumbnail", "thumbnail")):
+            render_page(path, column)  # pemanasan
+            start = time.perf_counter()
+            for _ in range(repeat):
+                transferred = render_page(path, column)
+            elapsed_ms = (time.perf_counter() - start) / repeat * 1000
+            results[name] = elapsed_ms
+            print(f"{name:>12}: {elapsed_ms:8.1f} ms/halaman, {transferred / 1e6:8.2f} MB ditransfer")
+        print(f"Percepatan render: {results['gambar penuh'] / results['thumbnail']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default="dataset_gambar")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.dataset, args.rows, args.repeat)
@@ -0,0 +1,100 @@
+"""Benchmark /history: semua riwayat tanpa indeks vs. keyset pagination + indeks.
+
+Jalur lama mengambil seluruh riwayat satu email dengan ORDER BY timestamp
+(full scan + sort). Jalur baru memakai history_query dari pagination.py dengan
+indeks (email, timestamp, id), untuk halaman pertama dan halaman terakhir.
+Database yang dipakai adalah SQLite sementara sebagai stand-in tabel detections.
+
+    python benchmarks/bench_history_pagination.py [--sizes 1000 10000 100000] [--limit 20]
+"""
+import argparse
+import datetime
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pagination import TIMESTAMP_FORMAT, history_query, split_page  # noqa: E402
+
+EMAIL = "benchmark@example.com"
+COLUMNS = "id, label, confidence, timestamp, image_name"
+OTHER_USERS = 4
+
+
+def build_database(history_size):
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        "CREATE TABLE detections (id INTEGER PRIMARY KEY, email TEXT, label TEXT, "
+        "confidence REAL, timestamp TEXT, image_name TEXT)"
+    )
+    start = datetime.datetime(2024, 1, 1)
+    rows = []
+    for index in range(history_size * (OTHER_USERS + 1)):
+        email = EMAIL if index % (OTHER_USERS + 1) == 0 else f"user{index % (OTHER_USERS + 1)}@example.com"
+        # Beberapa baris berbagi timestamp yang sama agar id ikut menentukan urutan
+        timestamp = (start + datetime.timedelta(seconds=index // 3)).strftime(TIMESTAMP_FORMAT)
+        rows.append((email, "Rusak Ringan", 90.0, timestamp, f"img_{index}"))
+    conn.executemany(
+        "INSERT INTO detections (email, label, confidence, timestamp, image_name) VALUES (?, ?, ?, ?, ?)",
+        rows
+    )
+    conn.commit()
+    return conn
+
+
+def fetch_page(conn, limit, cursor):
+    query, params = history_query(COLUMNS, EMAIL, limit, cursor)
+    params = [p.strftime(TIMESTAMP_FORMAT) if isinstance(p, datetime.datetime) else p for p in params]
+    rows = [dict(row) for row in conn.execute(query.replace("%s", "?"), params).fetchall()]
+    return split_page(rows, limit)
+
+
+def timed_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.median(timings)
+
+
+def run(sizes, limit, repeat):
+    print(f"Ukuran halaman: {limit}, {repeat} pengulangan (median)")
+    for size in sizes:
+        conn = build_database(size)
+        full = timed_ms(lambda: conn.execute(
+            f"SELECT {COLUMNS} FROM detections WHERE email = ? ORDER BY timestamp DESC", (EMAIL,)
+        ).fetchall(), repeat)
+
+        conn.execute("CREATE INDEX idx_email_timestamp_id ON detections (email, timestamp, id)")
+        first = timed_ms(lambda: fetch_page(conn, limit, None), repeat)
+
+        # Telusuri semua halaman untuk memeriksa urutan dan mendapatkan cursor terakhir
+        seen, cursor = 0, None
+        while True:
+            items, next_cursor = fetch_page(conn, limit, cursor)
+            seen += len(items)
+            if next_cursor is None:
+                break
+            cursor = next_cursor
+        assert seen == size, f"{seen} != {size}"
+        last = timed_ms(lambda: fetch_page(conn, limit, cursor), repeat)
+        conn.close()
+
+        print(
+            f"{size:>8} riwayat: semua tanpa indeks {full:8.2f} ms, "
+            f"halaman pertama {first:6.3f} ms, halaman terakhir {last:6.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.sizes, args.limit, args.repeat)
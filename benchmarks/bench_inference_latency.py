@@ -0,0 +1,69 @@
+"""Benchmark latensi per gambar: model.predict vs. InferenceEngine (tf.function).
+
+    python benchmarks/bench_inference_latency.py [--model model/model_klasifikasirumah.h5]
+        [--dataset dataset_gambar] [--batch-sizes 1,8,32] [--repeat 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from preprocessing import load_image, image_to_array  # noqa: E402
+from inference import InferenceEngine  # noqa: E402
+
+VALID_EXTENSIONS = (".jpg", ".jpeg", ".png")
+LABELS = ["Rusak Berat", "Rusak Menengah", "Rusak Ringan"]
+
+
+def load_dataset(dataset_path):
+    images = []
+    for root, _, files in os.walk(dataset_path):
+        for name in sorted(files):
+            if name.lower().endswith(VALID_EXTENSIONS):
+                images.append(image_to_array(load_image(os.path.join(root, name))))
+    if not images:
+        raise SystemExit(f"Tidak ada gambar di {dataset_path}")
+    return np.stack(images)
+
+
+def measure(fn, batch, repeat):
+    fn(batch)  # warm-up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(batch)
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1000 / len(batch)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+def run(model_path, dataset_path, batch_sizes, repeat):
+    images = load_dataset(dataset_path)
+    engine = InferenceEngine(model_path, LABELS, warmup_batch_sizes=batch_sizes)
+    keras_model = engine.model
+
+    print(f"{'batch':>5} | {'model.predict p50/p99 (ms/img)':>32} | {'engine p50/p99 (ms/img)':>26}")
+    for batch_size in batch_sizes:
+        batch = images[np.arange(batch_size) % len(images)]
+        keras_p50, keras_p99 = measure(lambda b: keras_model.predict(b / 255.0, verbose=0), batch, repeat)
+        engine_p50, engine_p99 = measure(engine.predict_proba, batch, repeat)
+        print(f"{batch_size:>5} | {keras_p50:>15.2f} / {keras_p99:<14.2f} | {engine_p50:>12.2f} / {engine_p99:<11.2f}")
+
+    # Pastikan kedua jalur memberikan hasil yang sama
+    sample = images[:32]
+    keras_pred = np.argmax(keras_model.predict(sample / 255.0, verbose=0), axis=1)
+    engine_pred = np.argmax(engine.predict_proba(sample), axis=1)
+    print(f"Prediksi sama: {(keras_pred == engine_pred).mean() * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=os.path.join("model", "model_klasifikasirumah.h5"))
+    parser.add_argument("--dataset", default="dataset_gambar")
+    parser.add_argument("--batch-sizes", default="1,8,32")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    run(args.model, args.dataset, [int(size) for size in args.batch_sizes.split(",")], args.repeat)
@@ -0,0 +1,71 @@
+"""Benchmark baca dataset per epoch: decode file asli vs. shard uint8 memmap.
+
+Jalur lama men-decode dan me-resize setiap file JPEG/PNG asli setiap epoch
+(seperti load_img pada flow_from_directory). Jalur shard membaca batch acak
+berukuran 32 dari shard yang sudah di-decode. Waktu build awal dan build ulang
+tanpa perubahan ikut dilaporkan. Manifest dan shard dibuat di direktori sementara.
+
+    python benchmarks/bench_shard_store.py [--data dataset_gambar] [--epochs 3] [--workers N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataset_manifest import build_manifest, write_manifest  # noqa: E402
+from dataset_shards import ShardStore, build_shards, decode_image  # noqa: E402
+
+BATCH_SIZE = 32
+
+
+def decode_epoch(paths):
+    return sum(decode_image(path)[0] is not None for path in paths)
+
+
+def shard_epoch(store, locations, rng):
+    order = rng.permutation(len(locations))
+    images = 0
+    for start in range(0, len(order), BATCH_SIZE):
+        images += len(store.gather(locations[order[start:start + BATCH_SIZE]]))
+    return images
+
+
+def run(data_path, epochs, workers):
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest_path = os.path.join(tmp, "dataset_manifest.csv")
+        shard_dir = os.path.join(tmp, "dataset_shards")
+        rows, _ = build_manifest(data_path, manifest_path)
+        write_manifest(rows, manifest_path)
+        paths = [os.path.normpath(os.path.join(tmp, *row["path"].split("/"))) for row in rows]
+
+        for label in ("build awal", "build ulang (tanpa perubahan)"):
+            start = time.perf_counter()
+            summary = build_shards(rows, manifest_path, shard_dir, workers)
+            print(f"{label:>30}: {(time.perf_counter() - start) * 1000:8.1f} ms, {summary['decoded']} di-decode")
+
+        store = ShardStore(shard_dir)
+        locations = np.array([(row["shard"], row["offset"]) for row in store.rows], dtype=np.int64)
+        rng = np.random.default_rng(42)
+        for name, epoch in (("decode file asli", lambda: decode_epoch(paths)),
+                            ("shard memmap", lambda: shard_epoch(store, locations, rng))):
+            rates = []
+            for index in range(1, epochs + 1):
+                start = time.perf_counter()
+                images = epoch()
+                elapsed = time.perf_counter() - start
+                rates.append(images / elapsed)
+                print(f"{name:>18} epoch {index}: {images} gambar, {elapsed * 1000:8.1f} ms, {rates[-1]:10.1f} gambar/detik")
+            print(f"{name:>18} rata-rata: {sum(rates) / len(rates):10.1f} gambar/detik")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default="dataset_gambar")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    run(args.data, args.epochs, args.workers)
@@ -0,0 +1,106 @@
+"""Benchmark jalur unggahan /predict: file sementara vs. buffer di memori.
+
+Jalur lama menulis unggahan ke TEMP_DIR, membukanya lagi dengan PIL, membaca
+ulang seluruh file untuk blob MySQL, lalu menghapusnya. Jalur baru membaca
+stream sekali ke memori dan memakai bytes yang sama untuk decode dan blob.
+
+    python benchmarks/bench_upload_io.py [--dataset dataset_gambar] [--repeat 3]
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+VALID_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def list_images(dataset_path):
+    paths = []
+    for root, _, files in os.walk(dataset_path):
+        for name in sorted(files):
+            if name.lower().endswith(VALID_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def preprocess(img):
+    return np.asarray(img.resize((128, 128)), dtype=np.float32) / 255.0
+
+
+# Jalur lama: simpan, buka dari disk, baca ulang untuk blob, hapus
+def temp_file_path(upload, temp_dir, counters):
+    file_path = os.path.join(temp_dir, "upload.png")
+    upload.seek(0)
+    with open(file_path, "wb") as f:
+        data = upload.read()
+        f.write(data)
+        counters["bytes_written"] += len(data)
+
+    img = Image.open(file_path)
+    preprocess(img)
+    counters["bytes_read"] += os.path.getsize(file_path)
+    img.close()
+
+    with open(file_path, "rb") as img_file:
+        image_data = img_file.read()
+        counters["bytes_read"] += len(image_data)
+
+    os.remove(file_path)
+    counters["fs_ops"] += 4
+    return image_data
+
+
+# Jalur baru: baca stream sekali, decode dari buffer
+def in_memory_path(upload, counters):
+    upload.seek(0)
+    image_data = upload.read()
+    with Image.open(io.BytesIO(image_data)) as img:
+        preprocess(img)
+    return image_data
+
+
+def run(dataset_path, repeat):
+    uploads = []
+    for path in list_images(dataset_path):
+        with open(path, "rb") as f:
+            uploads.append(io.BytesIO(f.read()))
+    if not uploads:
+        raise SystemExit(f"Tidak ada gambar di {dataset_path}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, fn in (
+            ("temp_file", lambda upload, c: temp_file_path(upload, temp_dir, c)),
+            ("in_memory", in_memory_path),
+        ):
+            counters = {"bytes_written": 0, "bytes_read": 0, "fs_ops": 0}
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for upload in uploads:
+                    fn(upload, counters)
+            elapsed = time.perf_counter() - start
+            results[name] = (elapsed, counters)
+
+    total = len(uploads) * repeat
+    print(f"Gambar: {len(uploads)} x {repeat} pengulangan = {total} unggahan")
+    for name, (elapsed, counters) in results.items():
+        print(
+            f"{name:>10}: {elapsed / total * 1000:7.2f} ms/gambar, "
+            f"tulis disk {counters['bytes_written'] / 1e6:8.1f} MB, "
+            f"baca disk {counters['bytes_read'] / 1e6:8.1f} MB, "
+            f"operasi file {counters['fs_ops']}"
+        )
+    saved = results["temp_file"][0] - results["in_memory"][0]
+    print(f"Waktu dihemat: {saved / total * 1000:.2f} ms/gambar")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default="dataset_gambar")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.dataset, args.repeat)
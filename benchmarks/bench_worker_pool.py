@@ -0,0 +1,70 @@
+"""Benchmark throughput worker pool inferensi dari 1 sampai N proses.
+
+Setiap konfigurasi memproses seluruh gambar dataset_gambar dalam batch, dengan
+beberapa batch dikirim bersamaan agar semua worker sibuk.
+
+    python benchmarks/bench_worker_pool.py [--max-workers 4] [--threads 1] [--batch-size 16] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from preprocessing import load_image, image_to_array  # noqa: E402
+from worker_pool import InferenceWorkerPool  # noqa: E402
+
+VALID_EXTENSIONS = (".jpg", ".jpeg", ".png")
+LABELS = ["Rusak Berat", "Rusak Menengah", "Rusak Ringan"]
+
+
+def load_dataset(dataset_path):
+    images = []
+    for root, _, files in os.walk(dataset_path):
+        for name in sorted(files):
+            if name.lower().endswith(VALID_EXTENSIONS):
+                images.append(image_to_array(load_image(os.path.join(root, name))))
+    if not images:
+        raise SystemExit(f"Tidak ada gambar di {dataset_path}")
+    return np.stack(images)
+
+
+def run(model_path, dataset_path, max_workers, threads, batch_size, repeat):
+    images = load_dataset(dataset_path)
+    batches = [images[start:start + batch_size] for start in range(0, len(images), batch_size)]
+    total = len(images) * repeat
+
+    print(f"Gambar: {len(images)} x {repeat}, batch {batch_size}, {threads} intra-op thread per worker")
+    baseline = None
+    for num_workers in range(1, max_workers + 1):
+        pool = InferenceWorkerPool(model_path, LABELS, num_workers, threads)
+        try:
+            # Satu putaran pemanasan agar semua worker sudah tracing graph
+            for future in [pool.submit(batch) for batch in batches]:
+                future.result()
+
+            start = time.perf_counter()
+            futures = [pool.submit(batch) for _ in range(repeat) for batch in batches]
+            for future in futures:
+                future.result()
+            elapsed = time.perf_counter() - start
+        finally:
+            pool.close()
+
+        throughput = total / elapsed
+        baseline = baseline or throughput
+        print(f"{num_workers:>2} worker: {throughput:8.1f} gambar/detik ({throughput / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=os.path.join("model", "model_klasifikasirumah.h5"))
+    parser.add_argument("--dataset", default="dataset_gambar")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.model, args.dataset, args.max_workers, args.threads, args.batch_size, args.repeat)
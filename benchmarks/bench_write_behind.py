@@ -0,0 +1,157 @@
+"""Benchmark penyimpanan hasil /predict: sinkron vs. antrean write-behind.
+
+Backend ``mysql`` memakai pool di db.py (MySQL/MariaDB lokal dengan skema
+user_management.sql; baris uji dihapus setelahnya). Backend ``simulated``
+meniru round-trip database dengan jeda tetap per commit ditambah jeda per baris,
+tanpa server. Yang diukur adalah latensi yang ditanggung request dan jumlah
+baris per flush; di akhir dipastikan semua baris tersimpan setelah stop().
+
+    python benchmarks/bench_write_behind.py [--backend simulated|mysql] [--requests 2000] [--threads 8]
+"""
+import argparse
+import datetime
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from detection_writer import WriteBehindQueue, write_detections  # noqa: E402
+
+EMAIL = "write-behind-benchmark@example.com"
+
+
+# Koneksi tiruan: commit memakan `commit_ms` + `row_ms` per baris
+class SimulatedConnection:
+    rows_written = 0
+    lock = threading.Lock()
+
+    def __init__(self, commit_ms, row_ms):
+        self.commit_ms = commit_ms
+        self.row_ms = row_ms
+        self.pending = 0
+
+    def cursor(self):
+        return self
+
+    def executemany(self, query, rows):
+        if "INSERT INTO detections" in query:
+            self.pending += len(rows)
+
+    def commit(self):
+        time.sleep((self.commit_ms + self.row_ms * self.pending) / 1000)
+        with SimulatedConnection.lock:
+            SimulatedConnection.rows_written += self.pending
+        self.pending = 0
+
+    def rollback(self):
+        self.pending = 0
+
+    def close(self):
+        pass
+
+
+def simulated_backend(commit_ms, row_ms):
+    return lambda: SimulatedConnection(commit_ms, row_ms), lambda: SimulatedConnection.rows_written, lambda: None
+
+
+def mysql_backend():
+    import db
+
+    def count_rows():
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM detections WHERE email = %s", (EMAIL,))
+        count = cursor.fetchone()[0]
+        cursor.close()
+        conn.close()
+        return count
+
+    def cleanup():
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM detections WHERE email = %s", (EMAIL,))
+        cursor.execute("DELETE FROM detection_stats WHERE email = %s", (EMAIL,))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+    cleanup()
+    return db.get_connection, count_rows, cleanup
+
+
+def make_row(index):
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return (EMAIL, "Rusak Ringan", 90.0, timestamp, f"bench_{time.time_ns()}_{index}", "0" * 64, b"")
+
+
+def measure(save, requests, threads):
+    def timed(index):
+        start = time.perf_counter()
+        save([make_row(index)])
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        timings = np.array(list(executor.map(timed, range(requests))))
+    return timings, time.perf_counter() - start
+
+
+def run(backend, requests, threads, commit_ms, row_ms):
+    if backend == "mysql":
+        get_connection, count_rows, cleanup = mysql_backend()
+    else:
+        get_connection, count_rows, cleanup = simulated_backend(commit_ms, row_ms)
+
+    def save_sync(rows):
+        conn = get_connection()
+        try:
+            write_detections(conn, rows)
+        finally:
+            conn.close()
+
+    try:
+        print(f"Backend: {backend}, {requests} request, {threads} thread")
+        before = count_rows()
+        timings, elapsed = measure(save_sync, requests, threads)
+        print(
+            f"{'sinkron':>12}: p50 {np.percentile(timings, 50):7.3f} ms, p99 {np.percentile(timings, 99):7.3f} ms, "
+            f"{requests / elapsed:8.0f} baris/detik"
+        )
+
+        writer = WriteBehindQueue(get_connection)
+
+        def save_write_behind(rows):
+            if not writer.submit(rows):
+                save_sync(rows)
+
+        timings, _ = measure(save_write_behind, requests, threads)
+        start = time.perf_counter()
+        writer.stop()
+        flush_ms = (time.perf_counter() - start) * 1000
+        stats = writer.stats()
+        print(
+            f"{'write-behind':>12}: p50 {np.percentile(timings, 50):7.3f} ms, p99 {np.percentile(timings, 99):7.3f} ms, "
+            f"{stats['avg_rows_per_flush']:.1f} baris/flush, fallback sinkron {stats['sync_fallbacks']}, "
+            f"flush saat stop {flush_ms:.1f} ms"
+        )
+
+        written = count_rows() - before
+        print(f"Baris tersimpan: {written} dari {requests * 2}")
+        assert written == requests * 2, "Ada baris yang hilang"
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["simulated", "mysql"], default="simulated")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--commit-ms", type=float, default=2.0, help="Jeda commit tiruan (simulated)")
+    parser.add_argument("--row-ms", type=float, default=0.02, help="Jeda per baris tiruan (simulated)")
+    args = parser.parse_args()
+    run(args.backend, args.requests, args.threads, args.commit_ms, args.row_ms)
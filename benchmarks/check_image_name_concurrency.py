@@ -0,0 +1,60 @@
+"""Uji konkurensi naming.generate_image_name: banyak thread dan proses sekaligus.
+
+Memastikan semua nama unik dan nama dari satu thread selalu terurut naik,
+tanpa satu pun query ke database.
+
+    python benchmarks/check_image_name_concurrency.py [--processes 4] [--threads 8] [--names 5000]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from naming import generate_image_name, is_generated_name  # noqa: E402
+
+
+def generate_in_threads(threads, names_per_thread):
+    results = [None] * threads
+    barrier = threading.Barrier(threads)
+
+    def worker(index):
+        barrier.wait()
+        results[index] = [generate_image_name() for _ in range(names_per_thread)]
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return results
+
+
+def run(processes, threads, names_per_thread):
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        per_process = list(executor.map(generate_in_threads, [threads] * processes, [names_per_thread] * processes))
+    elapsed = time.perf_counter() - start
+
+    sequences = [names for process in per_process for names in process]
+    all_names = [name for names in sequences for name in names]
+    duplicates = len(all_names) - len(set(all_names))
+    unordered = sum(1 for names in sequences if names != sorted(names))
+    malformed = sum(1 for name in all_names if not is_generated_name(name))
+
+    print(f"{len(all_names)} nama dari {processes} proses x {threads} thread dalam {elapsed:.2f} detik")
+    print(f"Duplikat: {duplicates}, urutan per thread salah: {unordered}, format salah: {malformed}")
+    if duplicates or unordered or malformed:
+        raise SystemExit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--names", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.processes, args.threads, args.names)
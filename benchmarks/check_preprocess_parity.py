@@ -0,0 +1,96 @@
+"""Cek paritas dan kecepatan preprocessing cepat (draft JPEG) vs. jalur lama.
+
+Jalur lama: ``Image.open(path).resize((128, 128))`` dengan decode penuh.
+Jalur baru: ``preprocessing.load_image`` (decode skala kecil, EXIF, konversi RGB).
+Dengan ``--model``, prediksi kedua jalur juga dibandingkan terhadap label folder.
+
+    python benchmarks/check_preprocess_parity.py [--dataset dataset_gambar] [--model model/model_klasifikasirumah.h5]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from preprocessing import IMG_SIZE, load_image, image_to_array  # noqa: E402
+
+VALID_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# Urutan kelas sama dengan flow_from_directory (alfabetis) dan LABELS di app.py
+CLASS_NAMES = ["berat", "menengah", "ringan"]
+
+
+def list_images(dataset_path):
+    items = []
+    for class_index, class_name in enumerate(CLASS_NAMES):
+        class_path = os.path.join(dataset_path, class_name)
+        if not os.path.isdir(class_path):
+            continue
+        for name in sorted(os.listdir(class_path)):
+            if name.lower().endswith(VALID_EXTENSIONS):
+                items.append((os.path.join(class_path, name), class_index))
+    return items
+
+
+def baseline_load(path):
+    with Image.open(path) as img:
+        return img.resize(IMG_SIZE), img.size
+
+
+def run(dataset_path, model_path):
+    items = list_images(dataset_path)
+    if not items:
+        raise SystemExit(f"Tidak ada gambar di {dataset_path}")
+
+    baseline, fast = [], []
+    baseline_time = fast_time = 0.0
+    full_pixels = 0
+    mismatched_mode = 0
+    for path, _ in items:
+        start = time.perf_counter()
+        img, full_size = baseline_load(path)
+        baseline_time += time.perf_counter() - start
+        full_pixels += full_size[0] * full_size[1]
+        if img.mode != "RGB":
+            # Jalur lama menghasilkan 1 atau 4 kanal; model tidak bisa memakainya
+            mismatched_mode += 1
+            img = img.convert("RGB")
+        baseline.append(image_to_array(img))
+
+        start = time.perf_counter()
+        fast.append(image_to_array(load_image(path)))
+        fast_time += time.perf_counter() - start
+
+    baseline = np.stack(baseline)
+    fast = np.stack(fast)
+    diff = np.abs(baseline.astype(np.int16) - fast.astype(np.int16))
+    per_image_mae = diff.reshape(len(items), -1).mean(axis=1)
+
+    print(f"Gambar: {len(items)} ({full_pixels / len(items) / 1e6:.2f} MP rata-rata)")
+    print(f"Jalur lama: {baseline_time / len(items) * 1000:.2f} ms/gambar")
+    print(f"Jalur baru: {fast_time / len(items) * 1000:.2f} ms/gambar ({baseline_time / fast_time:.2f}x)")
+    print(f"Selisih piksel (0-255): MAE {per_image_mae.mean():.2f}, "
+          f"maks per gambar {per_image_mae.max():.2f}")
+    print(f"Gambar non-RGB yang gagal di jalur lama: {mismatched_mode}")
+
+    if model_path:
+        from tensorflow.keras.models import load_model
+
+        model = load_model(model_path)
+        labels = np.array([class_index for _, class_index in items])
+        baseline_pred = np.argmax(model.predict(baseline / 255.0, verbose=0), axis=1)
+        fast_pred = np.argmax(model.predict(fast / 255.0, verbose=0), axis=1)
+        print(f"Akurasi jalur lama: {(baseline_pred == labels).mean() * 100:.2f}%")
+        print(f"Akurasi jalur baru: {(fast_pred == labels).mean() * 100:.2f}%")
+        print(f"Prediksi sama: {(baseline_pred == fast_pred).mean() * 100:.2f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default="dataset_gambar")
+    parser.add_argument("--model", default=None, help="Path model .h5 untuk cek paritas akurasi")
+    args = parser.parse_args()
+    run(args.dataset, args.model)
@@ -0,0 +1,94 @@
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from hashlib import sha256
+
+# Direktori default penyimpanan gambar untuk LocalBlobStore
+BLOB_STORE_DIR = os.environ.get("BLOB_STORE_DIR", os.path.join(os.getcwd(), "blobs"))
+
+
+# Antarmuka penyimpanan isi gambar yang dialamatkan dengan hash SHA-256 isinya.
+# Implementasi lain (mis. object store bergaya MinIO/S3) cukup mengikuti
+# antarmuka ini; tabel detections hanya menyimpan hash-nya.
+class BlobStore(ABC):
+    @staticmethod
+    def content_hash(data):
+        return sha256(data).hexdigest()
+
+    # Simpan bytes dan kembalikan hash-nya. Isi yang sama hanya disimpan sekali.
+    @abstractmethod
+    def put(self, data):
+        ...
+
+    # Ambil bytes berdasarkan hash; KeyError bila tidak ada
+    @abstractmethod
+    def get(self, key):
+        ...
+
+    @abstractmethod
+    def exists(self, key):
+        ...
+
+    @abstractmethod
+    def delete(self, key):
+        ...
+
+
+# Penyimpanan di filesystem lokal, di-shard dua tingkat berdasarkan awalan hash
+# (ab/cd/abcd...) agar satu direktori tidak berisi terlalu banyak file.
+class LocalBlobStore(BlobStore):
+    def __init__(self, root=BLOB_STORE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, key):
+        if len(key) != 64 or any(char not in "0123456789abcdef" for char in key):
+            raise ValueError(f"Hash blob tidak valid: {key}")
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put(self, data):
+        key = self.content_hash(data)
+        path = self.path_for(key)
+        if os.path.exists(path):
+            return key
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Tulis ke file sementara lalu rename agar pembaca tidak pernah melihat file setengah jadi
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return key
+
+    def get(self, key):
+        try:
+            with open(self.path_for(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise KeyError(key) from None
+
+    def exists(self, key):
+        return os.path.exists(self.path_for(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self.path_for(key))
+        except FileNotFoundError:
+            pass
+
+
+_default_store = None
+
+
+# Blob store bersama untuk app.py, app_async.py, dan main.py
+def get_blob_store():
+    global _default_store
+    if _default_store is None:
+        _default_store = LocalBlobStore()
+    return _default_store
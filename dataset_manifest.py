@@ -0,0 +1,186 @@
+"""Bangun manifest pembagian dataset (train/val/test) tanpa menyalin gambar.
+
+Manifest CSV berisi satu baris per gambar: path (relatif terhadap file
+manifest), kelas, split, dan hash SHA-256 isi file. Split ditentukan dari hash
+isi file per kelas, dan gambar yang sudah ada di manifest sebelumnya tetap di
+split lamanya, sehingga gambar baru tidak mengacak ulang gambar lama. Gambar
+duplikat dalam satu kelas selalu berada di split yang sama. Kekurangan val dan
+test per kelas dilengkapi dari gambar baru saja. Pelatihan dan evaluasi membaca path gambar asli dari manifest.
+
+    python dataset_manifest.py [--data dataset_gambar] [--manifest dataset_manifest.csv]
+"""
+import argparse
+import csv
+import os
+from collections import Counter
+from hashlib import sha256
+
+MANIFEST_PATH = "dataset_manifest.csv"
+SPLITS = ("train", "val", "test")
+VALID_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif")
+# Proporsi sama dengan pembagian sebelumnya: test 10%, lalu val 20% dari sisa.
+# Dengan hash saja, jumlah per kelas bervariasi (dataset bawaan, 50 gambar per
+# kelas: val 2-13, test 4-6), jadi setiap kelas dilengkapi sampai floor(n x
+# proporsi) gambar per split (50 gambar: minimal 9 val dan 5 test). Tidak ada
+# batas atas, jadi sebuah kelas bisa mendapat lebih dari proporsinya. Hanya
+# gambar baru yang dipakai untuk melengkapi; bila gambar baru tidak cukup,
+# minimum bisa belum terpenuhi sampai data berikutnya ditambahkan.
+SPLIT_FRACTIONS = {"test": 0.1, "val": 0.9 * 0.2}
+# size dan mtime_ns dipakai untuk melewati hashing ulang file yang tidak berubah
+FIELDS = ["path", "class", "split", "sha256", "size", "mtime_ns"]
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Posisi gambar di [0, 1) dari 32 bit pertama hash isi file
+def hash_position(content_hash):
+    return int(content_hash[:8], 16) / 2 ** 32
+
+
+# Split dasar dari posisi hash
+def assign_split(content_hash):
+    position = hash_position(content_hash)
+    if position < SPLIT_FRACTIONS["test"]:
+        return "test"
+    if position < SPLIT_FRACTIONS["test"] + SPLIT_FRACTIONS["val"]:
+        return "val"
+    return "train"
+
+
+# Tetapkan split per kelas. Gambar yang (kelas, hash)-nya sudah ada di manifest
+# sebelumnya (previous_splits) tetap di split lamanya. Gambar baru mendapat split
+# dasar dari hash, lalu split test dan val yang kurang dari minimum kelasnya
+# diisi dari gambar baru di train dengan posisi hash terkecil (paling dekat ke
+# batas). Gambar dengan hash sama dipindah bersama. Gambar lama tidak pernah
+# dipindah, jadi gambar val/test tidak bisa bocor ke train saat data bertambah.
+def assign_splits(rows, previous_splits=None):
+    previous_splits = previous_splits or {}
+    by_class = {}
+    fixed = set()
+    for row in rows:
+        key = (row["class"], row["sha256"])
+        if key in previous_splits:
+            row["split"] = previous_splits[key]
+            fixed.add(key)
+        else:
+            row["split"] = assign_split(row["sha256"])
+        by_class.setdefault(row["class"], []).append(row)
+
+    for class_name, items in by_class.items():
+        groups = {}
+        for row in items:
+            if (class_name, row["sha256"]) not in fixed:
+                groups.setdefault(row["sha256"], []).append(row)
+        for split in ("test", "val"):
+            minimum = int(len(items) * SPLIT_FRACTIONS[split])
+            count = sum(row["split"] == split for row in items)
+            candidates = sorted(
+                (content_hash for content_hash, group in groups.items() if group[0]["split"] == "train"),
+                key=lambda content_hash: (hash_position(content_hash), content_hash),
+            )
+            for content_hash in candidates:
+                if count >= minimum:
+                    break
+                for row in groups[content_hash]:
+                    row["split"] = split
+                count += len(groups[content_hash])
+    return rows
+
+
+def read_manifest(manifest_path=MANIFEST_PATH):
+    with open(manifest_path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def write_manifest(rows, manifest_path=MANIFEST_PATH):
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(temp_path, manifest_path)
+
+
+# Pindai direktori bersubfolder per kelas dan bangun baris manifest. Hash dari
+# manifest sebelumnya dipakai ulang untuk file yang ukuran dan mtime-nya sama,
+# dan split lama dipertahankan untuk setiap isi file (kelas, hash) yang sudah ada.
+def build_manifest(data_path, manifest_path=MANIFEST_PATH):
+    previous = {}
+    if os.path.exists(manifest_path):
+        previous = {row["path"]: row for row in read_manifest(manifest_path)}
+    previous_splits = {(row["class"], row["sha256"]): row["split"] for row in previous.values()}
+
+    root = os.path.dirname(os.path.abspath(manifest_path))
+    rows = []
+    hashed = 0
+    class_names = sorted(
+        name for name in os.listdir(data_path) if os.path.isdir(os.path.join(data_path, name))
+    )
+    for class_name in class_names:
+        class_path = os.path.join(data_path, class_name)
+        for name in sorted(os.listdir(class_path)):
+            if not name.lower().endswith(VALID_EXTENSIONS):
+                continue
+            full_path = os.path.join(class_path, name)
+            path = os.path.relpath(os.path.abspath(full_path), root).replace(os.sep, "/")
+            stat = os.stat(full_path)
+            old = previous.get(path)
+            if old and int(old["size"]) == stat.st_size and int(old["mtime_ns"]) == stat.st_mtime_ns:
+                content_hash = old["sha256"]
+            else:
+                content_hash = file_hash(full_path)
+                hashed += 1
+            rows.append({
+                "path": path,
+                "class": class_name,
+                "split": None,
+                "sha256": content_hash,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            })
+    return assign_splits(rows, previous_splits), hashed
+
+
+# Path (absolut), indeks kelas, dan nama kelas untuk satu split. Urutan kelas
+# mengikuti flow_from_directory (nama kelas diurutkan) atas seluruh manifest.
+def split_items(split, manifest_path=MANIFEST_PATH, rows=None):
+    if split not in SPLITS:
+        raise ValueError(f"Split tidak dikenal: {split}")
+    rows = read_manifest(manifest_path) if rows is None else rows
+    root = os.path.dirname(os.path.abspath(manifest_path))
+    class_names = sorted({row["class"] for row in rows})
+    class_index = {name: index for index, name in enumerate(class_names)}
+    paths, labels = [], []
+    for row in rows:
+        if row["split"] == split:
+            paths.append(os.path.join(root, *row["path"].split("/")))
+            labels.append(class_index[row["class"]])
+    return paths, labels, class_names
+
+
+def summarize(rows):
+    counts = Counter((row["class"], row["split"]) for row in rows)
+    for class_name in sorted({row["class"] for row in rows}):
+        parts = ", ".join(f"{split} {counts[(class_name, split)]}" for split in SPLITS)
+        print(f"Kelas {class_name}: {parts}")
+    duplicates = sum(count - 1 for count in Counter(row["sha256"] for row in rows).values() if count > 1)
+    if duplicates:
+        print(f"Peringatan: {duplicates} gambar duplikat (isi sama) di dataset")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default="dataset_gambar")
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    args = parser.parse_args()
+
+    rows, hashed = build_manifest(args.data, args.manifest)
+    write_manifest(rows, args.manifest)
+    print(f"Manifest {args.manifest}: {len(rows)} gambar, {hashed} file di-hash ulang")
+    summarize(rows)
@@ -0,0 +1,162 @@
+"""Profil dataset gambar dalam satu lintasan paralel, dengan hasil yang di-cache.
+
+Setiap file dibaca sekali di process pool untuk menghitung ukuran (lebar x
+tinggi), mode, rata-rata warna RGB, ukuran file, status rusak, dan hash SHA-256
+(untuk mendeteksi duplikat). Hasil disimpan di file statistik CSV; saat
+dijalankan lagi hanya file baru atau yang berubah (ukuran/mtime) yang dipindai.
+
+    python dataset_profile.py [--data dataset_gambar] [--stats dataset_profile.csv] [--workers N]
+"""
+import argparse
+import csv
+import io
+import os
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha256
+
+from PIL import Image, ImageStat
+
+from dataset_manifest import VALID_EXTENSIONS
+
+STATS_PATH = "dataset_profile.csv"
+FIELDS = [
+    "path", "class", "size", "mtime_ns", "sha256",
+    "width", "height", "mode", "mean_r", "mean_g", "mean_b", "error",
+]
+# Kolom yang dibaca kembali sebagai angka dari file statistik
+INT_FIELDS = ("size", "mtime_ns", "width", "height")
+FLOAT_FIELDS = ("mean_r", "mean_g", "mean_b")
+
+
+# Profil satu file dari satu kali baca. Gambar yang gagal di-decode ditandai
+# lewat kolom error, bukan menghentikan seluruh profil.
+def profile_file(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    row = {"sha256": sha256(data).hexdigest(), "error": ""}
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            row.update(width=img.width, height=img.height, mode=img.mode)
+            img.load()
+            # Rata-rata per kanal setelah konversi ke RGB, agar gambar L/P/RGBA sebanding
+            mean = ImageStat.Stat(img.convert("RGB")).mean
+            row.update(mean_r=round(mean[0], 3), mean_g=round(mean[1], 3), mean_b=round(mean[2], 3))
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+# Daftar (path relatif, kelas, path lengkap, stat) dari direktori bersubfolder per kelas
+def list_files(data_path):
+    files = []
+    for class_name in sorted(os.listdir(data_path)):
+        class_path = os.path.join(data_path, class_name)
+        if not os.path.isdir(class_path):
+            continue
+        for name in sorted(os.listdir(class_path)):
+            if name.lower().endswith(VALID_EXTENSIONS):
+                full_path = os.path.join(class_path, name)
+                files.append((f"{class_name}/{name}", class_name, full_path, os.stat(full_path)))
+    return files
+
+
+def read_stats(stats_path=STATS_PATH):
+    if not os.path.exists(stats_path):
+        return {}
+    rows = {}
+    with open(stats_path, newline="") as f:
+        for row in csv.DictReader(f):
+            for field in INT_FIELDS:
+                row[field] = int(row[field]) if row[field] else None
+            for field in FLOAT_FIELDS:
+                row[field] = float(row[field]) if row[field] else None
+            rows[row["path"]] = row
+    return rows
+
+
+def write_stats(rows, stats_path=STATS_PATH):
+    temp_path = f"{stats_path}.tmp"
+    with open(temp_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(temp_path, stats_path)
+
+
+# Profil seluruh dataset. Baris dari file statistik dipakai ulang untuk file yang
+# ukuran dan mtime-nya sama; file yang sudah dihapus ikut hilang dari statistik.
+# Mengembalikan (baris, jumlah file yang dipindai ulang).
+def profile_dataset(data_path, stats_path=STATS_PATH, workers=None):
+    previous = read_stats(stats_path)
+    rows = []
+    pending = []
+    for path, class_name, full_path, stat in list_files(data_path):
+        old = previous.get(path)
+        if old and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+            rows.append(old)
+            continue
+        row = {field: None for field in FIELDS}
+        row.update({"path": path, "class": class_name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+        rows.append(row)
+        pending.append((row, full_path))
+
+    if pending:
+        workers = workers or os.cpu_count() or 1
+        full_paths = [full_path for _, full_path in pending]
+        chunksize = max(1, len(full_paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for (row, _), result in zip(pending, executor.map(profile_file, full_paths, chunksize=chunksize)):
+                row.update(result)
+        write_stats(rows, stats_path)
+    elif len(rows) != len(previous):
+        write_stats(rows, stats_path)
+    return rows, len(pending)
+
+
+# Kelompok file dengan isi yang sama (hash sama), hanya yang lebih dari satu
+def duplicate_groups(rows):
+    groups = defaultdict(list)
+    for row in rows:
+        groups[row["sha256"]].append(row["path"])
+    return [paths for paths in groups.values() if len(paths) > 1]
+
+
+def summarize(rows):
+    by_class = defaultdict(list)
+    for row in rows:
+        by_class[row["class"]].append(row)
+
+    for class_name, items in sorted(by_class.items()):
+        valid = [row for row in items if not row["error"]]
+        total_mb = sum(row["size"] for row in items) / 1e6
+        print(f"Kategori '{class_name}': {len(items)} gambar, {total_mb:.2f} MB")
+        print(f"  Mode: {dict(Counter(row['mode'] for row in valid))}")
+        print(f"  Dimensi: {Counter((row['width'], row['height']) for row in valid).most_common(5)}")
+        if valid:
+            mean = [sum(row[field] for row in valid) / len(valid) for field in FLOAT_FIELDS]
+            print(f"  Rata-rata warna (R, G, B): ({mean[0]:.1f}, {mean[1]:.1f}, {mean[2]:.1f})")
+
+    corrupt = [row for row in rows if row["error"]]
+    print(f"File rusak: {len(corrupt)}")
+    for row in corrupt:
+        print(f"  {row['path']}: {row['error']}")
+    groups = duplicate_groups(rows)
+    print(f"Kelompok duplikat: {len(groups)}")
+    for paths in groups:
+        print(f"  {', '.join(paths)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default="dataset_gambar")
+    parser.add_argument("--stats", default=STATS_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah proses (default: jumlah CPU)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows, scanned = profile_dataset(args.data, args.stats, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{len(rows)} gambar, {scanned} dipindai ulang dalam {elapsed:.2f} s -> {args.stats}")
+    summarize(rows)
@@ -0,0 +1,249 @@
+"""Bangun shard NumPy berisi gambar dataset yang sudah di-decode (128x128x3 uint8).
+
+Setiap gambar di manifest (lihat dataset_manifest.py) di-decode dan di-resize
+sekali, lalu disimpan di file shard .npy yang dibaca sebagai memmap saat
+pelatihan dan evaluasi. Slot shard dialamatkan dengan hash isi file, jadi
+build ulang hanya men-decode gambar baru atau yang berubah dan menulisnya ke
+shard baru; slot lama yang tidak terpakai dibuang dengan pemadatan (compact).
+
+    python dataset_shards.py [--data dataset_gambar] [--manifest dataset_manifest.csv] [--shards dataset_shards]
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from dataset_manifest import MANIFEST_PATH, SPLITS, build_manifest, write_manifest
+
+SHARD_DIR = "dataset_shards"
+IMG_SIZE = (128, 128)
+# 1024 gambar x 48 KiB = 48 MiB per shard
+SHARD_SIZE = 1024
+SHARD_VERSION = 2
+INDEX_FIELDS = ["path", "class", "split", "sha256", "shard", "offset"]
+# Pemadatan otomatis bila kurang dari separuh slot masih dipakai
+MIN_LIVE_FRACTION = 0.5
+
+
+def shard_name(number):
+    return f"shard_{number:05d}.npy"
+
+
+# Decode satu gambar seperti load_img Keras pada flow_from_directory (RGB,
+# resize nearest). Mengembalikan (array uint8, None) atau (None, pesan error).
+def decode_image(path, size=IMG_SIZE):
+    try:
+        with Image.open(path) as img:
+            img = img.convert("RGB").resize(size, Image.NEAREST)
+            return np.asarray(img, dtype=np.uint8), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def read_index(shard_dir=SHARD_DIR):
+    index_path = os.path.join(shard_dir, "index.csv")
+    meta_path = os.path.join(shard_dir, "shards.json")
+    if not (os.path.exists(index_path) and os.path.exists(meta_path)):
+        return [], None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    with open(index_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        row["shard"] = int(row["shard"])
+        row["offset"] = int(row["offset"])
+    return rows, meta
+
+
+def _write_index(shard_dir, rows, meta):
+    index_path = os.path.join(shard_dir, "index.csv")
+    with open(f"{index_path}.tmp", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=INDEX_FIELDS)
+        writer.writeheader()
+        writer.writerows({field: row[field] for field in INDEX_FIELDS} for row in rows)
+    meta_path = os.path.join(shard_dir, "shards.json")
+    with open(f"{meta_path}.tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    # Metadata ditulis setelah index; keduanya diganti atomik
+    os.replace(f"{index_path}.tmp", index_path)
+    os.replace(f"{meta_path}.tmp", meta_path)
+
+
+# Tulis satu shard baru dari iterator array; file baru terlihat setelah lengkap
+def _write_shard(shard_dir, number, count, images):
+    path = os.path.join(shard_dir, shard_name(number))
+    temp_path = f"{path}.tmp"
+    shard = np.lib.format.open_memmap(temp_path, mode="w+", dtype=np.uint8, shape=(count, *IMG_SIZE, 3))
+    for offset, image in enumerate(images):
+        shard[offset] = image
+    shard.flush()
+    del shard
+    os.replace(temp_path, path)
+
+
+# Bangun atau perbarui shard dari baris manifest. Slot gambar yang hash-nya sudah
+# ada dipakai ulang; gambar baru di-decode di process pool dan ditulis ke shard
+# baru. Mengembalikan ringkasan build.
+def build_shards(manifest_rows, manifest_path=MANIFEST_PATH, shard_dir=SHARD_DIR, workers=None, compact=False):
+    os.makedirs(shard_dir, exist_ok=True)
+    old_rows, meta = read_index(shard_dir)
+    if meta is None or meta.get("version") != SHARD_VERSION or tuple(meta.get("image_size", ())) != IMG_SIZE:
+        old_rows, meta = [], {"version": SHARD_VERSION, "image_size": list(IMG_SIZE), "shards": {}}
+    old_shards = {int(number): count for number, count in meta["shards"].items()}
+    slots = {row["sha256"]: (row["shard"], row["offset"]) for row in old_rows}
+
+    root = os.path.dirname(os.path.abspath(manifest_path))
+    missing = {}
+    for row in manifest_rows:
+        if row["sha256"] not in slots:
+            missing.setdefault(row["sha256"], os.path.join(root, *row["path"].split("/")))
+
+    live = {slots[row["sha256"]] for row in manifest_rows if row["sha256"] in slots}
+    total_slots = sum(old_shards.values())
+    if total_slots and (compact or len(live) < MIN_LIVE_FRACTION * total_slots):
+        slots, shards = _compact(shard_dir, slots, live, old_shards)
+    else:
+        shards = dict(old_shards)
+
+    # Tulis gambar baru ke shard baru, SHARD_SIZE gambar per shard
+    errors = {}
+    hashes = list(missing)
+    next_number = max(shards, default=-1) + 1
+    if hashes:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for start in range(0, len(hashes), SHARD_SIZE):
+                chunk = hashes[start:start + SHARD_SIZE]
+                results = executor.map(decode_image, [missing[h] for h in chunk], chunksize=max(1, len(chunk) // (workers * 4)))
+                decoded = []
+                for content_hash, (image, error) in zip(chunk, results):
+                    if error:
+                        errors[missing[content_hash]] = error
+                    else:
+                        decoded.append((content_hash, image))
+                if not decoded:
+                    continue
+                _write_shard(shard_dir, next_number, len(decoded), (image for _, image in decoded))
+                for offset, (content_hash, _) in enumerate(decoded):
+                    slots[content_hash] = (next_number, offset)
+                shards[next_number] = len(decoded)
+                next_number += 1
+
+    # Urutan kelas dari seluruh manifest, bukan hanya gambar yang berhasil di-decode,
+    # agar indeks kelas tetap sama dengan LABELS walau semua gambar satu kelas gagal
+    meta["class_names"] = sorted({row["class"] for row in manifest_rows})
+    index_rows = []
+    for row in manifest_rows:
+        if row["sha256"] in slots:
+            shard, offset = slots[row["sha256"]]
+            index_rows.append({**row, "shard": shard, "offset": offset})
+    referenced = {row["shard"] for row in index_rows}
+    meta["shards"] = {str(number): count for number, count in sorted(shards.items()) if number in referenced}
+    _write_index(shard_dir, index_rows, meta)
+
+    # Hapus shard yang tidak lagi dirujuk index (setelah index baru tersimpan)
+    for number in set(old_shards) | set(shards):
+        if number not in referenced:
+            path = os.path.join(shard_dir, shard_name(number))
+            if os.path.exists(path):
+                os.remove(path)
+
+    return {
+        "images": len(index_rows),
+        "decoded": len(hashes) - len(errors),
+        "errors": errors,
+        "empty_classes": sorted(set(meta["class_names"]) - {row["class"] for row in index_rows}),
+        "shards": len(meta["shards"]),
+        "slots": sum(meta["shards"].values()),
+    }
+
+
+# Salin slot yang masih dipakai ke shard baru (tanpa decode ulang)
+def _compact(shard_dir, slots, live, old_shards):
+    sources = {number: np.load(os.path.join(shard_dir, shard_name(number)), mmap_mode="r") for number in old_shards}
+    by_location = {location: content_hash for content_hash, location in slots.items() if location in live}
+    locations = sorted(by_location)
+    new_slots, shards = {}, {}
+    next_number = max(old_shards) + 1
+    for start in range(0, len(locations), SHARD_SIZE):
+        chunk = locations[start:start + SHARD_SIZE]
+        _write_shard(shard_dir, next_number, len(chunk), (sources[shard][offset] for shard, offset in chunk))
+        for offset, location in enumerate(chunk):
+            new_slots[by_location[location]] = (next_number, offset)
+        shards[next_number] = len(chunk)
+        next_number += 1
+    return new_slots, shards
+
+
+# Pembaca shard. Setiap shard dibuka sebagai memmap baca-saja, jadi gambar
+# dibaca langsung dari page cache tanpa memuat seluruh dataset ke memori.
+class ShardStore:
+    def __init__(self, shard_dir=SHARD_DIR):
+        self.shard_dir = shard_dir
+        self.rows, meta = read_index(shard_dir)
+        if meta is None:
+            raise FileNotFoundError(f"Index shard tidak ditemukan di {shard_dir}; jalankan dataset_shards.py")
+        self.image_size = tuple(meta["image_size"])
+        self.class_names = meta["class_names"]
+        self._shards = {}
+
+    def shard(self, number):
+        if number not in self._shards:
+            self._shards[number] = np.load(os.path.join(self.shard_dir, shard_name(number)), mmap_mode="r")
+        return self._shards[number]
+
+    def entries(self, split):
+        if split not in SPLITS:
+            raise ValueError(f"Split tidak dikenal: {split}")
+        return [row for row in self.rows if row["split"] == split]
+
+    # Lokasi (shard, offset) dan indeks kelas untuk satu split
+    def split(self, split):
+        entries = self.entries(split)
+        class_index = {name: index for index, name in enumerate(self.class_names)}
+        locations = np.array([(row["shard"], row["offset"]) for row in entries], dtype=np.int64).reshape(-1, 2)
+        labels = [class_index[row["class"]] for row in entries]
+        return locations, labels
+
+    # Satu gambar sebagai view memmap (tanpa salinan)
+    def image(self, shard, offset):
+        return self.shard(int(shard))[int(offset)]
+
+    # Kumpulkan gambar dari beberapa lokasi menjadi satu batch (N, H, W, 3)
+    def gather(self, locations):
+        locations = np.asarray(locations).reshape(-1, 2)
+        images = np.empty((len(locations), *self.image_size, 3), dtype=np.uint8)
+        for number in np.unique(locations[:, 0]):
+            mask = locations[:, 0] == number
+            images[mask] = self.shard(int(number))[locations[mask, 1]]
+        return images
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default="dataset_gambar")
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--shards", default=SHARD_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah proses decode (default: jumlah CPU)")
+    parser.add_argument("--compact", action="store_true", help="Padatkan shard walau sebagian besar slot masih dipakai")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    # Manifest diperbarui dulu agar gambar baru/berubah terdeteksi lewat hash-nya
+    rows, _ = build_manifest(args.data, args.manifest)
+    write_manifest(rows, args.manifest)
+    summary = build_shards(rows, args.manifest, args.shards, args.workers, args.compact)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{summary['images']} gambar di {summary['shards']} shard ({summary['slots']} slot), "
+        f"{summary['decoded']} di-decode dalam {elapsed:.2f} s -> {args.shards}"
+    )
+    for path, error in summary["errors"].items():
+        print(f"Gagal decode {path}: {error}")
+    for class_name in summary["empty_classes"]:
+        print(f"Peringatan: kelas {class_name} tidak punya gambar yang berhasil di-decode")
@@ -0,0 +1,62 @@
+import os
+import time
+import threading
+import logging
+
+import mysql.connector
+from mysql.connector import errors, pooling
+
+# Konfigurasi database
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",
+    "database": "user_management"
+}
+
+# Ukuran pool koneksi dan batas waktu menunggu koneksi kosong (detik)
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# Pool dibuat saat koneksi pertama diminta, bukan saat modul diimpor
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name="user_management",
+                    pool_size=DB_POOL_SIZE,
+                    pool_reset_session=True,
+                    **DB_CONFIG
+                )
+                logging.info(f"Pool koneksi database dibuat (ukuran {DB_POOL_SIZE})")
+    return _pool
+
+
+# Ambil koneksi dari pool. Koneksi diperiksa dulu (ping + reconnect) sehingga
+# koneksi yang putus karena wait_timeout MySQL tidak sampai ke pemanggil.
+# conn.close() mengembalikan koneksi ke pool, bukan menutupnya.
+def get_connection():
+    pool = get_pool()
+    deadline = time.monotonic() + DB_POOL_TIMEOUT
+    while True:
+        try:
+            conn = pool.get_connection()
+            break
+        except errors.PoolError:
+            # Semua koneksi sedang dipakai; tunggu sebentar lalu coba lagi
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.005)
+
+    try:
+        conn.ping(reconnect=True, attempts=2, delay=0)
+    except mysql.connector.Error:
+        conn.close()
+        raise
+    return conn
@@ -0,0 +1,175 @@
+"""Rollup statistik deteksi per pengguna dan label (tabel detection_stats).
+
+Setiap insert ke tabel detections juga memperbarui baris rollup (jumlah, total
+confidence, dan total kuadrat confidence) dalam transaksi yang sama, sehingga
+halaman Statistik dan endpoint /stats cukup membaca satu baris per label.
+
+    python detection_stats.py rebuild [--email EMAIL]   # hitung ulang dari tabel detections
+    python detection_stats.py check [--email EMAIL]     # bandingkan rollup dengan tabel detections
+"""
+import argparse
+import math
+import struct
+import sys
+
+# Upsert rollup; baris baru dibuat saat label pertama kali muncul untuk pengguna
+UPSERT_QUERY = """
+    INSERT INTO detection_stats (email, label, count, confidence_sum, confidence_sq_sum)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        count = count + VALUES(count),
+        confidence_sum = confidence_sum + VALUES(confidence_sum),
+        confidence_sq_sum = confidence_sq_sum + VALUES(confidence_sq_sum)
+"""
+
+SELECT_QUERY = """
+    SELECT label, count, confidence_sum, confidence_sq_sum
+    FROM detection_stats WHERE email = %s
+"""
+
+# Agregat yang sama dihitung langsung dari baris mentah
+AGGREGATE_QUERY = """
+    SELECT email, label, COUNT(*), SUM(confidence), SUM(confidence * confidence)
+    FROM detections {where} GROUP BY email, label
+"""
+
+
+# Kolom detections.confidence bertipe FLOAT (presisi tunggal); rollup memakai
+# nilai yang sudah dibulatkan sama agar tetap cocok dengan hasil rebuild
+def stored_confidence(confidence):
+    return struct.unpack("f", struct.pack("f", confidence))[0]
+
+
+# Gabungkan baris (email, label, confidence) menjadi parameter UPSERT_QUERY,
+# satu per (email, label). Urutan kunci tetap agar transaksi bersamaan mengunci
+# baris rollup dalam urutan yang sama (menghindari deadlock).
+def rollup_params(detections):
+    totals = {}
+    for email, label, confidence in detections:
+        confidence = stored_confidence(confidence)
+        count, total, squares = totals.get((email, label), (0, 0.0, 0.0))
+        totals[(email, label)] = (count + 1, total + confidence, squares + confidence * confidence)
+    return [(email, label, *values) for (email, label), values in sorted(totals.items())]
+
+
+# Perbarui rollup memakai cursor dari transaksi insert; commit dilakukan pemanggil
+def update_stats(cursor, detections):
+    params = rollup_params(detections)
+    if params:
+        cursor.executemany(UPSERT_QUERY, params)
+
+
+# Ringkasan statistik dari baris rollup (label, count, confidence_sum, confidence_sq_sum)
+def summarize(rows):
+    labels = []
+    total_count = 0
+    total_sum = 0.0
+    for label, count, confidence_sum, confidence_sq_sum in rows:
+        if count == 0:
+            continue
+        mean = confidence_sum / count
+        variance = (confidence_sq_sum - confidence_sum * mean) / (count - 1) if count > 1 else 0.0
+        labels.append({
+            "label": label,
+            "count": int(count),
+            "mean_confidence": mean,
+            "std_confidence": math.sqrt(max(variance, 0.0)),
+        })
+        total_count += count
+        total_sum += confidence_sum
+
+    labels.sort(key=lambda item: item["label"])
+    # Sama dengan mode() pandas: jumlah terbanyak, seri dipecah urutan label
+    most_common = min(labels, key=lambda item: -item["count"])["label"] if labels else None
+    return {
+        "total": int(total_count),
+        "mean_confidence": total_sum / total_count if total_count else None,
+        "most_common": most_common,
+        "labels": labels,
+    }
+
+
+# Statistik satu pengguna dari tabel rollup (O(jumlah label))
+def get_stats(conn, email):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SELECT_QUERY, (email,))
+        return summarize(cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def _where(email):
+    return ("WHERE email = %s", (email,)) if email else ("", ())
+
+
+# Hitung ulang rollup dari tabel detections (semua pengguna atau satu email)
+# dalam satu transaksi. INSERT ... SELECT mengunci baris detections yang dibaca
+# sehingga insert bersamaan menunggu sampai rebuild selesai.
+def rebuild(conn, email=None):
+    where, params = _where(email)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DELETE FROM detection_stats {where}", params)
+        cursor.execute(
+            "INSERT INTO detection_stats (email, label, count, confidence_sum, confidence_sq_sum) "
+            + AGGREGATE_QUERY.format(where=where),
+            params
+        )
+        rows = cursor.rowcount
+        conn.commit()
+        return rows
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+# Bandingkan rollup dengan agregat dari tabel detections. Mengembalikan daftar
+# (email, label, nilai rollup, nilai sebenarnya) untuk setiap selisih.
+def check_consistency(conn, email=None, rel_tol=1e-9):
+    where, params = _where(email)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(AGGREGATE_QUERY.format(where=where), params)
+        expected = {(row[0], row[1]): row[2:] for row in cursor.fetchall()}
+        cursor.execute(
+            f"SELECT email, label, count, confidence_sum, confidence_sq_sum FROM detection_stats {where}",
+            params
+        )
+        actual = {(row[0], row[1]): row[2:] for row in cursor.fetchall() if row[2]}
+    finally:
+        cursor.close()
+
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        want = expected.get(key, (0, 0.0, 0.0))
+        got = actual.get(key, (0, 0.0, 0.0))
+        if int(want[0]) != int(got[0]) or not all(
+            math.isclose(float(w), float(g), rel_tol=rel_tol, abs_tol=1e-6) for w, g in zip(want[1:], got[1:])
+        ):
+            mismatches.append((*key, tuple(got), tuple(want)))
+    return mismatches
+
+
+if __name__ == "__main__":
+    import db
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--email", help="Batasi ke satu pengguna")
+    args = parser.parse_args()
+
+    conn = db.get_connection()
+    try:
+        if args.command == "rebuild":
+            print(f"Rollup dibangun ulang: {rebuild(conn, args.email)} baris")
+        else:
+            mismatches = check_consistency(conn, args.email)
+            for email, label, got, want in mismatches:
+                print(f"TIDAK COCOK {email} / {label}: rollup {got}, detections {want}")
+            print(f"{len(mismatches)} selisih ditemukan")
+            sys.exit(1 if mismatches else 0)
+    finally:
+        conn.close()
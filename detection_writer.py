@@ -0,0 +1,227 @@
+import os
+import queue
+import threading
+import time
+import logging
+from collections import deque
+
+from detection_stats import update_stats
+
+# Satu baris detections: (email, label, confidence, timestamp, image_name, image_hash, thumbnail)
+INSERT_QUERY = """
+    INSERT INTO detections (email, label, confidence, timestamp, image_name, image_hash, thumbnail)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+# Simpan baris detections beserta rollup statistiknya dalam satu transaksi.
+# Untuk banyak baris, executemany mysql.connector mengirim satu INSERT multi-baris.
+def write_detections(conn, rows):
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(INSERT_QUERY, rows)
+        update_stats(cursor, [(email, label, confidence) for email, label, confidence, *_ in rows])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+# Pengaturan mode penyimpanan dari environment. DETECTION_WRITE_MODE=sync (default)
+# menyimpan sebelum respons dikirim; write-behind menyimpan di background.
+def writer_settings():
+    mode = os.environ.get("DETECTION_WRITE_MODE", "sync")
+    if mode not in ("sync", "write-behind"):
+        raise ValueError(f"DETECTION_WRITE_MODE tidak dikenal: {mode}")
+    return {
+        "mode": mode,
+        "max_pending": int(os.environ.get("WRITE_BEHIND_QUEUE_SIZE", 1000)),
+        "flush_rows": int(os.environ.get("WRITE_BEHIND_FLUSH_ROWS", 100)),
+        "flush_interval_ms": float(os.environ.get("WRITE_BEHIND_FLUSH_MS", 20)),
+        "put_timeout_ms": float(os.environ.get("WRITE_BEHIND_PUT_TIMEOUT_MS", 100)),
+    }
+
+
+# Antrean write-behind: request hanya memasukkan baris ke antrean terbatas, lalu
+# thread penulis menyimpannya per batch (setiap `flush_rows` baris atau setelah
+# `flush_interval_ms`). Jika antrean penuh lebih dari `put_timeout_ms`
+# (backpressure) atau penulis sudah berhenti, submit() mengembalikan False dan
+# pemanggil menyimpan secara sinkron. Bila satu batch tetap gagal, baris per
+# request lalu per baris disimpan terpisah agar satu baris buruk tidak ikut
+# menggagalkan baris lain; baris yang tetap gagal dicatat di `dead_letter`.
+class WriteBehindQueue:
+    def __init__(self, get_connection, max_pending=1000, flush_rows=100, flush_interval_ms=20,
+                 put_timeout_ms=100, max_attempts=3):
+        if flush_rows < 1:
+            raise ValueError("flush_rows minimal 1")
+        self.get_connection = get_connection
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.put_timeout = put_timeout_ms / 1000.0
+        self.max_attempts = max_attempts
+
+        # Satu elemen antrean = baris-baris dari satu request
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stats_lock = threading.Lock()
+        self._written_rows = 0
+        self._flushes = 0
+        self._failed_rows = 0
+        self._rejected = 0
+        self._last_flush_ms = 0.0
+        # Baris terakhir yang gagal disimpan (tanpa thumbnail), untuk diperiksa/diulang
+        self.dead_letter = deque(maxlen=1000)
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    # Masukkan baris ke antrean; False bila harus disimpan sinkron oleh pemanggil
+    def submit(self, rows):
+        if not self._running:
+            return False
+        try:
+            self._queue.put(list(rows), timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
+            return False
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "queue_depth": self.queue_depth(),
+                "written_rows": self._written_rows,
+                "flushes": self._flushes,
+                "avg_rows_per_flush": self._written_rows / self._flushes if self._flushes else 0.0,
+                "last_flush_ms": self._last_flush_ms,
+                "failed_rows": self._failed_rows,
+                "sync_fallbacks": self._rejected,
+            }
+
+    # Hentikan penulis setelah semua baris di antrean disimpan
+    def stop(self, timeout=None):
+        if not self._running:
+            return
+        self._running = False
+        self._queue.put(None)
+        self._thread.join(timeout)
+        # Baris yang masuk bersamaan dengan sinyal berhenti
+        if not self._thread.is_alive():
+            self._drain()
+
+    # Kumpulkan baris beberapa request; hasilnya daftar baris per request
+    def _collect(self, first):
+        groups = [first]
+        count = len(first)
+        deadline = time.monotonic() + self.flush_interval
+        while count < self.flush_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Sinyal berhenti: simpan batch ini lalu keluar
+                self._queue.put(None)
+                break
+            groups.append(item)
+            count += len(item)
+        return groups
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                self._drain()
+                break
+            self._flush(self._collect(first))
+
+    # Simpan sisa antrean sebelum thread berhenti
+    def _drain(self):
+        groups = []
+        count = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                continue
+            groups.append(item)
+            count += len(item)
+            if count >= self.flush_rows:
+                self._flush(groups)
+                groups, count = [], 0
+        if groups:
+            self._flush(groups)
+
+    # Satu percobaan menyimpan baris; mengembalikan exception atau None
+    def _write(self, rows):
+        conn = None
+        try:
+            conn = self.get_connection()
+            if conn is None:
+                raise RuntimeError("Koneksi database gagal")
+            write_detections(conn, rows)
+            return None
+        except Exception as e:
+            return e
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _flush(self, groups):
+        start = time.perf_counter()
+        rows = [row for group in groups for row in group]
+        for attempt in range(1, self.max_attempts + 1):
+            error = self._write(rows)
+            if error is None:
+                written = len(rows)
+                break
+            if attempt < self.max_attempts:
+                time.sleep(0.05 * 2 ** attempt)
+        else:
+            logging.error(f"Write-behind gagal menyimpan batch {len(rows)} baris: {error}; disimpan per request")
+            written = self._write_separately(groups)
+
+        with self._stats_lock:
+            self._written_rows += written
+            self._flushes += 1
+            self._last_flush_ms = (time.perf_counter() - start) * 1000
+
+    # Simpan per request, lalu per baris untuk request yang gagal, sehingga
+    # hanya baris yang memang gagal yang hilang. Mengembalikan jumlah baris tersimpan.
+    def _write_separately(self, groups):
+        written = 0
+        for group in groups:
+            if len(group) > 1 and self._write(group) is None:
+                written += len(group)
+                continue
+            for row in group:
+                error = self._write([row])
+                if error is None:
+                    written += 1
+                else:
+                    self._dead_letter(row, error)
+        return written
+
+    def _dead_letter(self, row, error):
+        email, label, confidence, timestamp, image_name, image_hash, _ = row
+        logging.error(
+            f"Write-behind membuang baris deteksi email={email} image_name={image_name} "
+            f"image_hash={image_hash}: {error}"
+        )
+        with self._stats_lock:
+            self._failed_rows += 1
+            self.dead_letter.append({
+                "email": email, "label": label, "confidence": confidence, "timestamp": timestamp,
+                "image_name": image_name, "image_hash": image_hash, "error": str(error),
+            })
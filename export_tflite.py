@@ -0,0 +1,116 @@
+"""Ekspor model Keras ke TFLite terkuantisasi beserta laporan paritas dan latensi.
+
+Menghasilkan dua model di samping file .h5:
+  - <nama>_dynamic.tflite : kuantisasi dynamic-range (bobot int8)
+  - <nama>_int8.tflite    : full-INT8 (bobot dan aktivasi), dikalibrasi dengan gambar train
+
+Laporan membandingkan akurasi test split, ukuran file, dan latensi p50/p99 per
+gambar terhadap model Keras, lalu disimpan sebagai JSON.
+
+    python export_tflite.py [--model model/model_klasifikasirumah.h5] [--manifest dataset_manifest.csv]
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from dataset_manifest import MANIFEST_PATH, SPLITS, split_items
+from inference import RUNTIMES, create_engine, runtime_model_path
+from preprocessing import load_image, image_to_array
+
+LABELS = ["Rusak Berat", "Rusak Menengah", "Rusak Ringan"]
+
+
+# Pembagian dataset yang sama dengan pelatihan, dibaca dari manifest
+def split_dataset(manifest_path):
+    splits = {}
+    for split in SPLITS:
+        paths, labels, _ = split_items(split, manifest_path)
+        splits[split] = list(zip(paths, labels))
+    return splits
+
+
+def load_arrays(items):
+    images = np.stack([image_to_array(load_image(path)) for path, _ in items])
+    labels = np.array([class_index for _, class_index in items])
+    return images, labels
+
+
+def convert(model, quantization, calibration_images=None):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "int8":
+        def representative_dataset():
+            for image in calibration_images:
+                yield [image[np.newaxis].astype(np.float32) / 255.0]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.uint8
+        converter.inference_output_type = tf.uint8
+    return converter.convert()
+
+
+def measure_latency(engine, images, repeat):
+    timings = []
+    for i in range(repeat):
+        image = images[i % len(images)]
+        start = time.perf_counter()
+        engine.predict_proba(image)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+
+def run(model_path, manifest_path, calibration_size, repeat, report_path):
+    splits = split_dataset(manifest_path)
+    # Ambil sampel kalibrasi acak (deterministik) agar semua kelas terwakili
+    order = np.random.default_rng(42).permutation(len(splits["train"]))[:calibration_size]
+    calibration_images, _ = load_arrays([splits["train"][i] for i in order])
+    test_images, test_labels = load_arrays(splits["test"])
+
+    keras_model = tf.keras.models.load_model(model_path, compile=False)
+    for runtime, quantization in (("tflite-dynamic", "dynamic"), ("tflite-int8", "int8")):
+        output_path = runtime_model_path(model_path, runtime)
+        with open(output_path, "wb") as f:
+            f.write(convert(keras_model, quantization, calibration_images))
+        print(f"Model {runtime} disimpan di {output_path}")
+
+    report = {"manifest": manifest_path, "test_images": len(test_images), "runtimes": {}}
+    for runtime in RUNTIMES:
+        engine = create_engine(model_path, LABELS, runtime=runtime)
+        predictions = np.argmax(engine.predict_proba(test_images), axis=1)
+        p50, p99 = measure_latency(engine, test_images, repeat)
+        report["runtimes"][runtime] = {
+            "model_path": engine.model_path,
+            "size_mb": os.path.getsize(engine.model_path) / 1e6,
+            "test_accuracy": float((predictions == test_labels).mean()),
+            "latency_p50_ms": p50,
+            "latency_p99_ms": p99,
+        }
+
+    baseline = report["runtimes"]["keras"]
+    print(f"{'runtime':<15} {'ukuran (MB)':>12} {'akurasi':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for runtime, result in report["runtimes"].items():
+        print(
+            f"{runtime:<15} {result['size_mb']:>12.2f} {result['test_accuracy'] * 100:>8.2f}% "
+            f"{result['latency_p50_ms']:>9.2f} {result['latency_p99_ms']:>9.2f}"
+        )
+        result["accuracy_delta"] = result["test_accuracy"] - baseline["test_accuracy"]
+
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Laporan disimpan di {report_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=os.path.join("model", "model_klasifikasirumah.h5"))
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--calibration-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--report", default=os.path.join("model", "quantization_report.json"))
+    args = parser.parse_args()
+    run(args.model, args.manifest, args.calibration_size, args.repeat, args.report)
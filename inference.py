@@ -0,0 +1,164 @@
+import os
+import logging
+import threading
+import time
+
+import numpy as np
+
+from preprocessing import IMG_SIZE
+
+# TensorFlow diimpor secara lazy (lihat _import_tensorflow) karena import-nya
+# memakan beberapa detik; server HTTP bisa aktif lebih dulu
+tf = None
+
+# Runtime inferensi yang didukung; model TFLite dihasilkan oleh export_tflite.py
+RUNTIMES = ("keras", "tflite-dynamic", "tflite-int8")
+TFLITE_SUFFIXES = {"tflite-dynamic": "_dynamic.tflite", "tflite-int8": "_int8.tflite"}
+
+
+# Import TensorFlow saat pertama kali dibutuhkan dan catat durasinya
+def _import_tensorflow(timings):
+    global tf
+    start = time.perf_counter()
+    if tf is None:
+        import tensorflow
+        tf = tensorflow
+    timings["import_tensorflow"] = time.perf_counter() - start
+    return tf
+
+
+# Runtime yang dipilih lewat environment variable INFERENCE_RUNTIME
+def configured_runtime():
+    return os.environ.get("INFERENCE_RUNTIME", "keras")
+
+
+# Path file model yang dipakai oleh runtime tertentu
+def runtime_model_path(model_path, runtime="keras"):
+    if runtime == "keras":
+        return model_path
+    return os.path.splitext(model_path)[0] + TFLITE_SUFFIXES[runtime]
+
+
+# Label dan confidence (persen) dari array probabilitas (N, jumlah_kelas)
+def decode_predictions(probabilities, labels):
+    indices = np.argmax(probabilities, axis=1)
+    return [
+        (labels[index], float(row[index]) * 100)
+        for index, row in zip(indices, probabilities)
+    ]
+
+
+# Inti inferensi bersama untuk API (app.py) dan aplikasi Streamlit (main.py).
+# Model Keras dibungkus dalam tf.function dengan signature tetap sehingga graph
+# hanya di-trace sekali saat warm-up, bukan overhead model.predict per panggilan.
+class InferenceEngine:
+    runtime = "keras"
+
+    def __init__(self, model_path, labels, warmup_batch_sizes=(1,)):
+        self.labels = list(labels)
+        self.model_path = model_path
+        # Durasi tiap fase inisialisasi (detik), dilaporkan saat startup
+        self.timings = {}
+        _import_tensorflow(self.timings)
+
+        start = time.perf_counter()
+        self.model = tf.keras.models.load_model(model_path, compile=False)
+        self._forward = tf.function(
+            self._call_model,
+            input_signature=[tf.TensorSpec(shape=(None, IMG_SIZE[1], IMG_SIZE[0], 3), dtype=tf.uint8)],
+        )
+        self.timings["load_model"] = time.perf_counter() - start
+        self.warmup(warmup_batch_sizes)
+
+    def _call_model(self, images):
+        # Normalisasi dilakukan di dalam graph agar input tetap uint8
+        inputs = tf.cast(images, tf.float32) / 255.0
+        return self.model(inputs, training=False)
+
+    # Jalankan forward pass dengan input kosong agar tracing selesai sebelum request pertama
+    def warmup(self, batch_sizes=(1,)):
+        start = time.perf_counter()
+        for batch_size in batch_sizes:
+            self.predict_proba(np.zeros((batch_size, IMG_SIZE[1], IMG_SIZE[0], 3), dtype=np.uint8))
+        self.timings["warmup"] = time.perf_counter() - start
+        logging.info(f"Warm-up model ({self.runtime}) selesai dalam {self.timings['warmup'] * 1000:.0f} ms")
+
+    # Probabilitas kelas untuk batch uint8 (N, 128, 128, 3)
+    def predict_proba(self, images):
+        images = np.asarray(images, dtype=np.uint8)
+        if images.ndim == 3:
+            images = images[np.newaxis]
+        return self._forward(images).numpy()
+
+    # Label dan confidence (persen) untuk setiap gambar dalam batch
+    def predict(self, images):
+        return decode_predictions(self.predict_proba(images), self.labels)
+
+
+# Engine berbasis interpreter TFLite (model terkuantisasi) dengan antarmuka yang
+# sama dengan InferenceEngine. Interpreter tidak thread-safe, jadi setiap
+# pemanggilan dilindungi lock.
+class TFLiteEngine(InferenceEngine):
+    def __init__(self, model_path, labels, runtime="tflite-dynamic", warmup_batch_sizes=(1,), num_threads=None):
+        self.labels = list(labels)
+        self.model_path = model_path
+        self.runtime = runtime
+        self.timings = {}
+        _import_tensorflow(self.timings)
+
+        start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = None
+        self.timings["load_model"] = time.perf_counter() - start
+        self.warmup(warmup_batch_sizes)
+
+    # Ubah ukuran batch interpreter bila berbeda dari pemanggilan sebelumnya
+    def _ensure_batch_size(self, batch_size):
+        if batch_size != self._batch_size:
+            self._interpreter.resize_tensor_input(
+                self._input["index"], [batch_size, IMG_SIZE[1], IMG_SIZE[0], 3]
+            )
+            self._interpreter.allocate_tensors()
+            self._input = self._interpreter.get_input_details()[0]
+            self._output = self._interpreter.get_output_details()[0]
+            self._batch_size = batch_size
+
+    def _quantize_input(self, images):
+        dtype = self._input["dtype"]
+        if dtype == np.float32:
+            return images.astype(np.float32) / 255.0
+        scale, zero_point = self._input["quantization"]
+        quantized = np.round(images.astype(np.float32) / 255.0 / scale + zero_point)
+        info = np.iinfo(dtype)
+        return np.clip(quantized, info.min, info.max).astype(dtype)
+
+    def _dequantize_output(self, outputs):
+        if self._output["dtype"] == np.float32:
+            return outputs
+        scale, zero_point = self._output["quantization"]
+        return (outputs.astype(np.float32) - zero_point) * scale
+
+    def predict_proba(self, images):
+        images = np.asarray(images, dtype=np.uint8)
+        if images.ndim == 3:
+            images = images[np.newaxis]
+        with self._lock:
+            self._ensure_batch_size(len(images))
+            self._interpreter.set_tensor(self._input["index"], self._quantize_input(images))
+            self._interpreter.invoke()
+            outputs = self._interpreter.get_tensor(self._output["index"])
+        return self._dequantize_output(outputs)
+
+
+# Buat engine sesuai runtime; default diambil dari environment variable
+# INFERENCE_RUNTIME (keras, tflite-dynamic, atau tflite-int8)
+def create_engine(model_path, labels, runtime=None, **kwargs):
+    runtime = runtime or configured_runtime()
+    if runtime not in RUNTIMES:
+        raise ValueError(f"Runtime tidak dikenal: {runtime} (pilihan: {', '.join(RUNTIMES)})")
+    if runtime == "keras":
+        return InferenceEngine(model_path, labels, **kwargs)
+    return TFLiteEngine(runtime_model_path(model_path, runtime), labels, runtime=runtime, **kwargs)
@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from naming import new_image_id
+
+# Lokasi file SQLite antrean job dan jumlah worker pemrosesnya
+JOB_QUEUE_PATH = os.environ.get("JOB_QUEUE_PATH", os.path.join(os.getcwd(), "jobs.db"))
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+# Job yang sudah selesai dihapus setelah umur ini (jam) saat antrean dibuka
+JOB_RETENTION_HOURS = float(os.environ.get("JOB_RETENTION_HOURS", 24))
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        result TEXT,
+        error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+"""
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def _ms(start, end):
+    return round((end - start) * 1000, 1) if start is not None and end is not None else None
+
+
+# Antrean job persisten di SQLite. Job yang masih "running" saat proses mati
+# dikembalikan ke antrean ketika antrean dibuka lagi, sehingga tidak ada job yang
+# hilang karena restart. `handler(payload)` dijalankan oleh `num_workers` thread
+# setelah start() dan mengembalikan hasil yang bisa di-serialize ke JSON.
+class JobQueue:
+    def __init__(self, path=JOB_QUEUE_PATH, handler=None, num_workers=JOB_WORKERS,
+                 poll_interval=0.5, max_attempts=3, retention_hours=JOB_RETENTION_HOURS):
+        self.path = path
+        self.handler = handler
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._start_lock = threading.Lock()
+        self._running = False
+        self._workers = []
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        recovered = conn.execute(
+            "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING)
+        ).rowcount
+        if recovered:
+            logging.info(f"{recovered} job yang terputus dikembalikan ke antrean")
+        conn.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+            (DONE, FAILED, time.time() - retention_hours * 3600)
+        )
+
+    # Satu koneksi per thread; WAL agar pembaca tidak terblokir oleh worker
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # Tambahkan job baru; mengembalikan id-nya
+    def enqueue(self, payload):
+        job_id = f"job_{new_image_id()}"
+        self._connect().execute(
+            "INSERT INTO jobs (id, status, payload, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, QUEUED, json.dumps(payload), time.time())
+        )
+        self._wakeup.set()
+        return job_id
+
+    # Status dan hasil satu job, atau None bila id tidak dikenal
+    def get(self, job_id):
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "wait_ms": _ms(row["created_at"], row["started_at"]),
+            "service_ms": _ms(row["started_at"], row["finished_at"]),
+        }
+        if row["result"] is not None:
+            job["result"] = json.loads(row["result"])
+        if row["error"] is not None:
+            job["error"] = row["error"]
+        return job
+
+    # Ambil job terlama yang masih menunggu dan tandai sebagai "running"
+    def _claim(self):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, payload, attempts FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (RUNNING, time.time(), row["id"])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def _finish(self, job_id, status, result=None, error=None):
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+            (status, None if result is None else json.dumps(result), error, time.time(), job_id)
+        )
+
+    # Kembalikan job ke antrean untuk dicoba lagi
+    def _requeue(self, job_id, error):
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, started_at = NULL, error = ? WHERE id = ?", (QUEUED, error, job_id)
+        )
+
+    def _work(self):
+        while self._running:
+            try:
+                job = self._claim()
+            except sqlite3.Error as e:
+                logging.error(f"Gagal mengambil job: {e}")
+                job = None
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            # Termasuk percobaan yang terputus karena proses berhenti
+            attempt = job["attempts"] + 1
+            if attempt > self.max_attempts:
+                self._finish(job["id"], FAILED, error="Melebihi batas percobaan")
+                continue
+
+            try:
+                result = self.handler(json.loads(job["payload"]))
+                self._finish(job["id"], DONE, result=result)
+            except Exception as e:
+                logging.error(f"Job {job['id']} gagal (percobaan {attempt}): {e}")
+                if attempt < self.max_attempts:
+                    self._requeue(job["id"], str(e))
+                else:
+                    self._finish(job["id"], FAILED, error=str(e))
+
+    def start(self):
+        with self._start_lock:
+            if self._running:
+                return
+            self._running = True
+            self._workers = [
+                threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+                for index in range(self.num_workers)
+            ]
+            for worker in self._workers:
+                worker.start()
+
+    # Hentikan worker setelah job yang sedang diproses selesai; job yang masih
+    # menunggu tetap tersimpan dan diproses setelah restart
+    def stop(self, timeout=None):
+        self._running = False
+        self._wakeup.set()
+        for worker in self._workers:
+            worker.join(timeout)
+
+    # Kedalaman antrean dan waktu tunggu/layanan job yang selesai baru-baru ini
+    def stats(self, recent=1000):
+        conn = self._connect()
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        for row in conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row["status"]] = row["n"]
+        oldest = conn.execute("SELECT MIN(created_at) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+        rows = conn.execute(
+            "SELECT created_at, started_at, finished_at FROM jobs WHERE finished_at IS NOT NULL "
+            "ORDER BY finished_at DESC LIMIT ?",
+            (recent,)
+        ).fetchall()
+        wait = sorted(_ms(row["created_at"], row["started_at"]) for row in rows)
+        service = sorted(_ms(row["started_at"], row["finished_at"]) for row in rows)
+
+        def percentile(values, q):
+            return values[min(int(len(values) * q), len(values) - 1)] if values else None
+
+        return {
+            "depth": counts[QUEUED],
+            "running": counts[RUNNING],
+            "done": counts[DONE],
+            "failed": counts[FAILED],
+            "workers": self.num_workers if self._running else 0,
+            "oldest_queued_age_ms": _ms(oldest, time.time()) if oldest is not None else None,
+            "wait_ms": {"p50": percentile(wait, 0.5), "p95": percentile(wait, 0.95)},
+            "service_ms": {"p50": percentile(service, 0.5), "p95": percentile(service, 0.95)},
+        }
+
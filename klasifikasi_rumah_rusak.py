@@ -48,7 +48,10 @@ Original file is located at
 """
 
 import matplotlib.pyplot as plt
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
+from dataset_manifest import build_manifest, summarize, write_manifest
+from dataset_profile import duplicate_groups, profile_dataset
+from dataset_shards import build_shards
+from training_data import dataset_from_shards
 from tensorflow.keras.applications import MobileNetV2
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense, GlobalAveragePooling2D, Dropout
@@ -56,7 +59,6 @@ from sklearn.metrics import classification_report, confusion_matrix, ConfusionMa
 import numpy as np
 import os
 import shutil
-from sklearn.model_selection import train_test_split
 from google.colab import files
 from collections import Counter
 import zipfile
@@ -159,71 +161,35 @@ plt.ylabel('Jumlah Gambar')
 plt.title('Jumlah Gambar per Kategori')
 plt.show()
 
-# Filter untuk file gambar
-valid_extensions = (".jpg", ".jpeg", ".png")
-
-image_sizes = {}
-
-for category in categories:
-    folder_path = os.path.join(base_path, category)
-    sizes = []
-    for img_file in os.listdir(folder_path):
-        img_path = os.path.join(folder_path, img_file)
-        # Pastikan hanya file gambar yang diproses
-        if os.path.isfile(img_path) and img_file.lower().endswith(valid_extensions):
-            with Image.open(img_path) as img:
-                sizes.append(img.size)
-    image_sizes[category] = sizes
+# Profil dataset dalam satu lintasan: setiap gambar dibaca sekali (paralel) untuk
+# ukuran, mode, rata-rata warna, ukuran file, status rusak, dan hash duplikat.
+# Hasil di-cache di dataset_profile.csv; hanya file baru/berubah yang dipindai ulang.
+profile_rows, scanned = profile_dataset(base_path, "dataset_profile.csv")
+print(f"{len(profile_rows)} gambar diprofilkan, {scanned} dipindai ulang.")
+
+valid_rows = [row for row in profile_rows if not row["error"]]
+image_sizes = {category: [] for category in categories}
+average_colors = {category: [] for category in categories}
+for row in valid_rows:
+    if row["class"] in image_sizes:
+        image_sizes[row["class"]].append((row["width"], row["height"]))
+        average_colors[row["class"]].append(np.array([row["mean_r"], row["mean_g"], row["mean_b"]]))
+dimensions = {category: Counter(sizes) for category, sizes in image_sizes.items()}
 
 # Tampilkan ukuran gambar untuk setiap kategori
 for category, sizes in image_sizes.items():
     print(f"Kategori '{category}' memiliki ukuran gambar: {sizes[:5]} ")
 
-# Fungsi untuk menghitung rata-rata warna
-def calculate_average_color(image_path):
-    with Image.open(image_path) as img:
-        img_array = np.array(img)
-        avg_color = img_array.mean(axis=(0, 1))
-        return avg_color
-
-# Path ke folder dataset
-base_path = "/content/dataset_gambar"
-categories = ["berat", "menengah", "ringan"]
-
-average_colors = {}
-
-# Iterasi setiap kategori
-for category in categories:
-    folder_path = os.path.join(base_path, category)
-    avg_colors = []
-    for img_file in os.listdir(folder_path):
-        img_path = os.path.join(folder_path, img_file)
-        if os.path.isfile(img_path) and img_file.lower().endswith(('.jpg', '.jpeg', '.png')):
-            avg_colors.append(calculate_average_color(img_path))
-    average_colors[category] = avg_colors
-
 # Tampilkan rata-rata warna untuk setiap kategori
 for category, colors in average_colors.items():
     print(f"Kategori '{category}' memiliki rata-rata warna: {colors[:5]} (contoh)")
 
-valid_extensions = (".jpg", ".jpeg", ".png")
-
-dimensions = {}
-
-for category in categories:
-    folder_path = os.path.join(base_path, category)
-    dims = []
-    for img_file in os.listdir(folder_path):
-        img_path = os.path.join(folder_path, img_file)
-        # Abaikan jika bukan file atau jika bukan file gambar
-        if os.path.isdir(img_path) or not img_file.lower().endswith(valid_extensions):
-            continue
-        try:
-            with Image.open(img_path) as img:
-                dims.append(img.size)
-        except Exception as e:
-            print(f"Error membuka file {img_path}: {e}")
-    dimensions[category] = Counter(dims)
+# File rusak dan gambar duplikat (isi sama)
+for row in profile_rows:
+    if row["error"]:
+        print(f"Error membuka file {row['path']}: {row['error']}")
+for paths in duplicate_groups(profile_rows):
+    print(f"Duplikat: {', '.join(paths)}")
 
 # Tampilkan distribusi dimensi untuk setiap kategori
 for category, dim_counter in dimensions.items():
@@ -239,45 +205,22 @@ Dataset Splitting 🗂️
 """
 
 data_path = "dataset_gambar"
-output_path = "splitted_dataset"
-
-# Buat folder untuk train, val, test
-if not os.path.exists(output_path):
-    os.makedirs(output_path)
-    os.makedirs(os.path.join(output_path, "train"))
-    os.makedirs(os.path.join(output_path, "val"))
-    os.makedirs(os.path.join(output_path, "test"))
-
-# Fungsi untuk mengecek file gambar
-def is_image_file(filename):
-    valid_extensions = (".jpg", ".jpeg", ".png", ".bmp", ".gif")
-    return filename.lower().endswith(valid_extensions)
-
-# Bagi dataset
-for class_name in os.listdir(data_path):
-    class_path = os.path.join(data_path, class_name)
-    if not os.path.isdir(class_path):
-        continue  # Lewati jika bukan folder
-
-    # Ambil hanya file gambar
-    images = [img for img in os.listdir(class_path) if is_image_file(img)]
-    print(f"Folder {class_path} memiliki {len(images)} gambar.")
-    if len(images) == 0:
-        print(f"Tidak ada file gambar di folder {class_path}, dilewati.")
-        continue
-
-    # Split dataset menjadi train, val, test
-    train, test = train_test_split(images, test_size=0.1, random_state=42)
-    train, val = train_test_split(train, test_size=0.2, random_state=42)
-
-    # Copy data ke folder masing-masing
-    for split, split_name in zip([train, val, test], ["train", "val", "test"]):
-        split_dir = os.path.join(output_path, split_name, class_name)
-        os.makedirs(split_dir, exist_ok=True)
-        for img in split:
-            shutil.copy(os.path.join(class_path, img), os.path.join(split_dir, img))
-
-print("Dataset berhasil dibagi menjadi train, val, dan test.")
+manifest_path = "dataset_manifest.csv"
+
+# Pembagian dicatat di manifest (path, kelas, split, hash isi file), tanpa menyalin
+# gambar. Split ditentukan dari hash isi file (test ~10%, val ~18%, train sisanya),
+# sehingga gambar baru masuk ke split yang tetap tanpa mengacak ulang gambar lama.
+# Setiap kelas dilengkapi sampai minimal floor(n x proporsi) gambar val dan test.
+# Hanya file baru atau yang berubah yang di-hash ulang (lihat dataset_manifest.py).
+manifest_rows, hashed = build_manifest(data_path, manifest_path)
+write_manifest(manifest_rows, manifest_path)
+print(f"Manifest {manifest_path}: {len(manifest_rows)} gambar, {hashed} file di-hash ulang.")
+summarize(manifest_rows)
+
+# Decode dan resize setiap gambar sekali ke shard uint8 128x128x3 (memmap) di
+# dataset_shards/. Build ulang hanya men-decode gambar baru atau yang berubah.
+shard_summary = build_shards(manifest_rows, manifest_path)
+print(f"Shard: {shard_summary['images']} gambar, {shard_summary['decoded']} di-decode.")
 
 """# <a id='splitting' href=#splitting>
 <h1 style="font-family: Garamond; font-size: 40px; font-style: normal; letter-spacing: 3px;
@@ -288,47 +231,19 @@ Preprocessing 🔄
 
 """
 
-# Path dataset split
-train_path = "splitted_dataset/train"
-val_path = "splitted_dataset/val"
-test_path = "splitted_dataset/test"
-
-# Data Augmentation
-datagen = ImageDataGenerator(
-    rescale=1.0/255,
-    rotation_range=30,
-    width_shift_range=0.2,
-    height_shift_range=0.2,
-    shear_range=0.2,
-    zoom_range=0.2,
-    horizontal_flip=True,
-    fill_mode="nearest"
-)
-
-test_datagen = ImageDataGenerator(rescale=1.0/255)
-
-# Data Generator
-train_gen = datagen.flow_from_directory(
-    directory=train_path,
-    target_size=(128, 128),
-    batch_size=32,
-    class_mode="categorical"
-)
-
-val_gen = datagen.flow_from_directory(
-    directory=val_path,
-    target_size=(128, 128),
-    batch_size=32,
-    class_mode="categorical"
-)
-
-test_gen = test_datagen.flow_from_directory(
-    directory=test_path,
-    target_size=(128, 128),
-    batch_size=32,
-    class_mode="categorical",
-    shuffle=False
-)
+# Pipeline tf.data: gambar per batch dibaca langsung dari shard memmap (tanpa
+# decode ulang), augmentasi per batch, dan prefetch (lihat training_data.py). Augmentasi sama dengan
+# ImageDataGenerator sebelumnya: rotasi 30, geser 0.2, shear 0.2, zoom 0.2,
+# flip horizontal, fill_mode nearest, rescale 1/255.
+# Perbandingan throughput: python benchmarks/bench_training_input.py
+train_ds, train_labels, class_names = dataset_from_shards("train", augment=True, shuffle=True, seed=42)
+
+# Seperti sebelumnya (val_gen memakai datagen yang sama), data validasi ikut diaugmentasi
+val_ds, val_labels, _ = dataset_from_shards("val", augment=True)
+
+test_ds, test_labels, _ = dataset_from_shards("test")
+num_classes = len(class_names)
+print(f"Train: {len(train_labels)} gambar, Val: {len(val_labels)} gambar, Test: {len(test_labels)} gambar, kelas: {class_names}")
 
 """# <a id='splitting' href=#splitting>
 <h1 style="font-family: Garamond; font-size: 40px; font-style: normal; letter-spacing: 3px;
@@ -349,7 +264,7 @@ model = Sequential([
     Dropout(0.5),
     Dense(128, activation='relu'),
     Dropout(0.3),
-    Dense(train_gen.num_classes, activation='softmax')
+    Dense(num_classes, activation='softmax')
 ])
 
 model.compile(optimizer='adam',
@@ -357,7 +272,7 @@ model.compile(optimizer='adam',
               metrics=['accuracy'])
 
 # Pelatihan Model
-history = model.fit(train_gen, validation_data=val_gen, epochs=25)
+history = model.fit(train_ds, validation_data=val_ds, epochs=25)
 
 # Visualisasi Train Loss
 plt.plot(history.history['loss'], label='Train Loss')
@@ -381,19 +296,19 @@ Model Evaluation 🧪
 
 # Evaluasi Model pada Test Dataset
 print("Evaluasi pada Test Dataset...")
-test_preds = model.predict(test_gen)
+test_preds = model.predict(test_ds)
 test_preds_classes = np.argmax(test_preds, axis=1)
-true_classes = test_gen.classes
+true_classes = np.array(test_labels)
 
 # Confusion Matrix
 cm = confusion_matrix(true_classes, test_preds_classes)
-disp = ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=test_gen.class_indices.keys())
+disp = ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=class_names)
 disp.plot(cmap='Blues')
 plt.title("Confusion Matrix - Test Dataset")
 plt.show()
 
 # Classification Report
-report = classification_report(true_classes, test_preds_classes, target_names=test_gen.class_indices.keys())
+report = classification_report(true_classes, test_preds_classes, target_names=class_names)
 print("Classification Report - Test Dataset:")
 print(report)
 
@@ -429,7 +344,7 @@ for filename in uploaded.keys():
     label, confidence = predict_image_with_visualization(
         model,
         filename,
-        list(train_gen.class_indices.keys())
+        class_names
     )
     print(f"Gambar: {filename} -> Prediksi: {label} (Confidence: {confidence:.4f})")
 
@@ -466,7 +381,7 @@ for filename in uploaded.keys():
     label, confidence = predict_image_with_visualization(
         model,  # Menggunakan model yang dilatih sebelumnya
         filename,
-        list(train_gen.class_indices.keys())
+        class_names
     )
     print(f"Gambar: {filename} -> Prediksi: {label} (Confidence: {confidence:.4f})")
 
@@ -498,7 +413,7 @@ for filename in uploaded.keys():
     label, confidence = predict_image_with_visualization(
         model,  # Menggunakan model yang dilatih sebelumnya
         filename,
-        list(train_gen.class_indices.keys())
+        class_names
     )
     print(f"Gambar: {filename} -> Prediksi: {label} (Confidence: {confidence:.4f})")
 
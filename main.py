@@ -1,16 +1,25 @@
 import os
 import mysql.connector
+import db
+from naming import generate_image_name
+from pagination import HISTORY_PAGE_SIZE, history_query, split_page
+from detection_stats import get_stats
+from detection_writer import write_detections
+from blob_store import get_blob_store
 import streamlit as st
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array
 from streamlit_option_menu import option_menu
 from PIL import Image
 import numpy as np
 from hashlib import sha256
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import io
+import time
 import pandas as pd
 import plotly.express as px
+from prediction_cache import PredictionCache, model_version, cache_settings
+from preprocessing import load_image, image_to_array, make_thumbnail
+from inference import create_engine
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -101,21 +110,13 @@ def load_css():
         </style>
     """, unsafe_allow_html=True)
 
-# Konfigurasi database
-DB_CONFIG = {
-    "host": "localhost",
-    "user": "root",
-    "password": "",
-    "database": "user_management"
-}
-
 # Path model AI
 MODEL_PATH = os.path.join(os.getcwd(), "model", "model_klasifikasirumah.h5")
 
-# Fungsi koneksi database
+# Fungsi koneksi database (diambil dari pool, lihat db.py)
 def get_connection():
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = db.get_connection()
         return conn
     except mysql.connector.Error as err:
         st.error(f"❌ Koneksi ke database gagal: {err}")
@@ -186,98 +187,198 @@ def login_user(email, password):
         cursor.close()
         conn.close()
 
-# Fungsi untuk mendapatkan nomor gambar terakhir
-def get_last_image_number(cursor):
-    try:
-        cursor.execute("SELECT MAX(CAST(SUBSTRING(image_name, 5) AS UNSIGNED)) FROM detections WHERE image_name LIKE 'img_%'")
-        result = cursor.fetchone()
-        if result and result[0]:
-            return result[0]
-        return 0
-    except mysql.connector.Error:
-        return 0
-
-# Fungsi untuk generate nama gambar unik
-def generate_unique_image_name(cursor):
-    last_number = get_last_image_number(cursor)
-    new_number = last_number + 1
-    return f"img_{new_number}"
-
-# Fungsi menyimpan riwayat deteksi
-def save_detection(email, label, confidence, timestamp, image):
+# Fungsi menyimpan banyak riwayat deteksi sekaligus dalam satu bulk insert.
+# `detections` berisi tuple (label, confidence, timestamp, img_blob, thumbnail).
+def save_detections(email, detections):
     conn = get_connection()
     if conn is None:
         return False
 
-    cursor = conn.cursor()
     try:
-        # Generate unique image name
-        image_name = generate_unique_image_name(cursor)
-        
-        # Convert image to PNG format
-        img_byte_arr = io.BytesIO()
-        image.save(img_byte_arr, format='PNG')
-        img_blob = img_byte_arr.getvalue()
-
-        query = """
-            INSERT INTO detections (email, label, confidence, timestamp, image_data, image_name)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(query, (email, label, confidence, timestamp, img_blob, image_name))
-        conn.commit()
+        # Gambar disimpan di blob store, tabel hanya menyimpan hash-nya.
+        # Nama gambar unik dibuat tanpa query ke tabel detections.
+        blob_store = get_blob_store()
+        rows = [
+            (email, label, confidence, timestamp, generate_image_name(), blob_store.put(img_blob), thumbnail)
+            for label, confidence, timestamp, img_blob, thumbnail in detections
+        ]
+        # Insert dan rollup statistik dalam satu transaksi
+        write_detections(conn, rows)
         return True
     except mysql.connector.Error as err:
         st.error(f"❌ Error menyimpan data deteksi: {err}")
         return False
     finally:
-        cursor.close()
         conn.close()
 
-# Fungsi mengambil riwayat deteksi
-def get_detection_history(email):
+# Fungsi mengambil satu halaman riwayat deteksi, dimulai setelah `page_cursor`.
+# Hanya thumbnail yang ikut diambil; gambar ukuran penuh dimuat terpisah lewat
+# load_detection_image. Mengembalikan (baris, cursor halaman berikutnya).
+def get_detection_history(email, limit=HISTORY_PAGE_SIZE, page_cursor=None):
     conn = get_connection()
     if conn is None:
-        return []
+        return [], None
 
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT id, label, confidence, timestamp, image_data, image_name 
-            FROM detections 
-            WHERE email = %s 
-            ORDER BY timestamp DESC
-        """, (email,))
-        return cursor.fetchall()
+        query, params = history_query(
+            "id, label, confidence, timestamp, image_hash, thumbnail, image_name",
+            email, limit, page_cursor
+        )
+        cursor.execute(query, params)
+        return split_page(cursor.fetchall(), limit)
     except mysql.connector.Error as err:
         st.error(f"❌ Error mengambil riwayat: {err}")
-        return []
+        return [], None
+    finally:
+        cursor.close()
+        conn.close()
+
+# Fungsi mengambil isi gambar deteksi dari blob store (atau kolom image_data
+# untuk baris lama yang belum dimigrasi)
+def load_detection_image(item, email):
+    if item.get('image_hash'):
+        try:
+            return get_blob_store().get(item['image_hash'])
+        except KeyError:
+            return None
+
+    conn = get_connection()
+    if conn is None:
+        return None
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT image_data FROM detections WHERE id = %s AND email = %s", (item['id'], email))
+        row = cursor.fetchone()
+        return bytes(row[0]) if row and row[0] else None
+    except mysql.connector.Error as err:
+        st.error(f"❌ Error mengambil gambar: {err}")
+        return None
     finally:
         cursor.close()
         conn.close()
 
+# Label kategori kerusakan
+LABELS = ["🏚 Rusak Berat", "🏠 Rusak Menengah", "🛠 Rusak Ringan"]
+
 # Fungsi memuat model AI
 @st.cache_resource
 def load_ai_model(model_path):
     try:
-        return load_model(model_path)
+        return create_engine(model_path, LABELS)
     except Exception as e:
         st.error(f"❌ Gagal memuat model AI: {e}")
         return None
 
-# Fungsi prediksi kerusakan
-def predict_image(model, image):
+# Fungsi memuat cache prediksi (dibagikan ke semua sesi Streamlit)
+@st.cache_resource
+def load_prediction_cache(model_path):
+    settings = cache_settings()
+    return PredictionCache(
+        model_version(model_path),
+        max_entries=settings["max_entries"],
+        get_connection=get_connection if settings["persist"] else None
+    )
+
+# Jumlah thread untuk decode unggahan secara paralel
+DECODE_WORKERS = int(os.environ.get("DECODE_WORKERS", os.cpu_count() or 4))
+
+# Fungsi decode satu unggahan menjadi array input model (decode draft yang diperkecil)
+def decode_upload(image_bytes):
+    return image_to_array(load_image(io.BytesIO(image_bytes)))
+
+# Fungsi prediksi kerusakan untuk satu batch array uint8 dalam satu pemanggilan model.
+# `cache_keys` sejajar dengan `img_arrays`; hasil disimpan ke cache prediksi.
+def predict_images(model, img_arrays, cache_keys):
     try:
-        img = image.resize((128, 128))
-        img_array = img_to_array(img) / 255.0
-        img_array = np.expand_dims(img_array, axis=0)
-        predictions = model.predict(img_array)
-        predicted_index = np.argmax(predictions)
-        confidence = predictions[0][predicted_index] * 100
-        label = ["🏚 Rusak Berat", "🏠 Rusak Menengah", "🛠 Rusak Ringan"][predicted_index]
-        return label, confidence
+        cache = load_prediction_cache(model.model_path)
+        predictions = model.predict_proba(np.stack(img_arrays))
+        results = []
+        for cache_key, prediction in zip(cache_keys, predictions):
+            predicted_index = int(np.argmax(prediction))
+            confidence = float(prediction[predicted_index]) * 100
+            cache.put(cache_key, predicted_index, confidence)
+            results.append((LABELS[predicted_index], confidence))
+        return results
     except Exception as e:
         st.error(f"❌ Error saat prediksi: {e}")
-        return None, None
+        return [(None, None)] * len(img_arrays)
+
+# Fungsi mencatat pekerjaan mahal (inferensi model, penulisan database) per sesi,
+# untuk memastikan rerun Streamlit tidak mengulanginya
+def record_work(kind, count=1):
+    work = st.session_state.setdefault("upload_work", {"model_calls": 0, "db_writes": 0})
+    work[kind] += count
+
+# Kunci memoization unggahan: id file dari Streamlit dan hash isinya
+def upload_key(uploaded_file, image_bytes):
+    return f"{uploaded_file.file_id}:{sha256(image_bytes).hexdigest()}"
+
+# Fungsi memproses semua unggahan: cek cache dulu, decode paralel hanya untuk yang
+# belum ada di cache, satu batch inferensi, satu bulk insert.
+# Mengembalikan hasil per file dan durasi tiap tahap (detik).
+def process_uploads(model, uploads, email, progress):
+    timings = {}
+    total_steps = len(uploads) + 2
+    cache = load_prediction_cache(model.model_path)
+
+    # Tahap 1: cek cache prediksi sebelum gambar di-decode
+    start = time.perf_counter()
+    results = [(None, None)] * len(uploads)
+    pending = []
+    for index, (_, image_bytes) in enumerate(uploads):
+        cache_key = cache.make_key(image_bytes)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            results[index] = (LABELS[cached[0]], cached[1])
+        else:
+            pending.append((index, cache_key))
+    timings["Cache"] = time.perf_counter() - start
+
+    # Tahap 2: decode dan resize paralel untuk gambar yang belum ada di cache
+    start = time.perf_counter()
+    decoded = []
+    with ThreadPoolExecutor(max_workers=DECODE_WORKERS) as executor:
+        futures = {executor.submit(decode_upload, uploads[index][1]): (index, cache_key) for index, cache_key in pending}
+        for done, future in enumerate(as_completed(futures), start=1):
+            index, cache_key = futures[future]
+            try:
+                decoded.append((index, cache_key, future.result()))
+            except Exception as e:
+                st.error(f"❌ Gagal membaca gambar {uploads[index][0]}: {e}")
+            progress.progress(done / total_steps, text=f"⚙ Decode gambar {done}/{len(pending)}")
+    timings["Decode"] = time.perf_counter() - start
+
+    # Tahap 3: prediksi semua gambar yang sudah di-decode dalam satu batch
+    start = time.perf_counter()
+    if decoded:
+        record_work("model_calls")
+        predictions = predict_images(model, [img_array for _, _, img_array in decoded], [key for _, key, _ in decoded])
+        for (index, _, _), prediction in zip(decoded, predictions):
+            results[index] = prediction
+    timings["Inferensi"] = time.perf_counter() - start
+    progress.progress((len(uploads) + 1) / total_steps, text="⚙ Menyimpan hasil deteksi...")
+
+    # Tahap 4: simpan bytes unggahan asli (blob store berbasis hash isi, sama
+    # dengan API) dan thumbnail, semua hasil dalam satu bulk insert
+    start = time.perf_counter()
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    indices = [index for index, (label, _) in enumerate(results) if label is not None]
+    with ThreadPoolExecutor(max_workers=DECODE_WORKERS) as executor:
+        thumbnails = list(executor.map(make_thumbnail, [uploads[index][1] for index in indices]))
+    detections = [
+        (results[index][0], results[index][1], timestamp, uploads[index][1], thumbnail)
+        for index, thumbnail in zip(indices, thumbnails)
+    ]
+    saved = False
+    if detections:
+        record_work("db_writes")
+        saved = save_detections(email, detections)
+    timings["Simpan"] = time.perf_counter() - start
+    progress.progress(1.0, text="✅ Selesai")
+
+    return results, saved, timings
 
 # Halaman login
 def login_page():
@@ -368,39 +469,86 @@ def detection_page(model):
         accept_multiple_files=True
     )
     
-    if uploaded_files:
+    if uploaded_files and model is None:
+        st.error("❌ Model AI tidak tersedia, deteksi tidak dapat dijalankan.")
+    elif uploaded_files:
+        # Streamlit menjalankan ulang skrip pada setiap interaksi; hasil unggahan yang
+        # sudah diproses diingat per sesi agar tidak diprediksi dan disimpan ulang
+        processed = st.session_state.setdefault("processed_uploads", {})
+        uploads = []
         for uploaded_file in uploaded_files:
-            image = Image.open(uploaded_file)
-            st.image(image, caption=f"🖼 Gambar yang diunggah: {uploaded_file.name}", use_container_width=True)
-            
-            with st.spinner(f"⚙ Memproses gambar {uploaded_file.name}..."):
-                label, confidence = predict_image(model, image)
-                
+            image_bytes = uploaded_file.getvalue()
+            uploads.append((upload_key(uploaded_file, image_bytes), uploaded_file.name, image_bytes))
+
+        new_uploads = [(name, image_bytes) for key, name, image_bytes in uploads if key not in processed]
+        # Hasil yang ditampilkan pada render ini, termasuk yang belum tersimpan
+        shown = dict(processed)
+        if new_uploads:
+            progress = st.progress(0.0, text=f"⚙ Memproses {len(new_uploads)} gambar...")
+            results, saved, timings = process_uploads(model, new_uploads, st.session_state["email"], progress)
+            new_keys = [key for key, _, _ in uploads if key not in processed]
+            for key, (label, confidence) in zip(new_keys, results):
+                if label is not None:
+                    shown[key] = (label, confidence)
+                    # Hanya unggahan yang sudah tersimpan yang diingat; yang gagal
+                    # diprediksi atau disimpan dicoba lagi pada rerun berikutnya
+                    if saved:
+                        processed[key] = (label, confidence)
+            st.session_state["upload_timings"] = timings
+            if saved:
+                st.success(f"📂 {sum(1 for label, _ in results if label)} data berhasil disimpan ke database!")
+                st.balloons()
+            elif any(label for label, _ in results):
+                st.error("❌ Hasil deteksi gagal disimpan ke database. Penyimpanan akan dicoba lagi saat halaman dimuat ulang.")
+
+        timings = st.session_state.get("upload_timings", {})
+        work = st.session_state.get("upload_work", {"model_calls": 0, "db_writes": 0})
+        st.caption(
+            "⏱ " + " · ".join(f"{stage}: {seconds:.2f} detik" for stage, seconds in timings.items())
+            + f" | Sesi ini: {work['model_calls']}x inferensi model, {work['db_writes']}x penulisan database"
+        )
+
+        for key, name, image_bytes in uploads:
+            st.image(image_bytes, caption=f"🖼 Gambar yang diunggah: {name}", use_container_width=True)
+            label, confidence = shown.get(key, (None, None))
             if label:
                 st.markdown(f"""
                 <div class="alert alert-success">
                     ✅ Hasil Deteksi: {label} ({confidence:.2f}% kepercayaan)
                 </div>
                 """, unsafe_allow_html=True)
-                
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                if save_detection(st.session_state["email"], label, confidence, timestamp, image):
-                    st.success("📂 Data berhasil disimpan ke database!")
-                    st.balloons()
 
 # Halaman riwayat
 def history_page():
     st.title("📜 Riwayat Deteksi")
-    history = get_detection_history(st.session_state["email"])
+    start = time.perf_counter()
+    email = st.session_state["email"]
+    # Tumpukan cursor halaman yang sudah dibuka; elemen terakhir adalah halaman aktif
+    page_cursors = st.session_state.setdefault("history_cursors", [None])
+    history, next_cursor = get_detection_history(email, HISTORY_PAGE_SIZE, page_cursors[-1])
+    loaded_bytes = 0
     
     if history:
         for item in history:
             with st.expander(f"🕒 {item['timestamp']} - {item['label']} ({item['image_name']})"):
                 col1, col2 = st.columns([1, 2])
                 with col1:
-                    if item['image_data']:
-                        img = Image.open(io.BytesIO(item['image_data']))
-                        st.image(img, caption=f"🖼 {item['image_name']}")
+                    if item['thumbnail']:
+                        thumbnail = bytes(item['thumbnail'])
+                        loaded_bytes += len(thumbnail)
+                        st.image(thumbnail, caption=f"🖼 {item['image_name']}")
+                    else:
+                        st.caption("Thumbnail belum tersedia")
+
+                    # Gambar ukuran penuh hanya dimuat saat diminta
+                    if st.toggle("🔍 Tampilkan gambar asli", key=f"full_image_{item['id']}"):
+                        image_data = load_detection_image(item, email)
+                        if image_data:
+                            loaded_bytes += len(image_data)
+                            img = Image.open(io.BytesIO(image_data))
+                            st.image(img, caption=f"🖼 {item['image_name']}")
+                        else:
+                            st.warning("⚠ Gambar asli tidak ditemukan.")
                 with col2:
                     st.markdown(f"""
                     <div class="card">
@@ -410,6 +558,21 @@ def history_page():
                         <p>{item['image_name']}</p>
                     </div>
                     """, unsafe_allow_html=True)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        st.caption(f"⏱ {len(history)} riwayat dimuat dalam {elapsed_ms:.0f} ms · {loaded_bytes / 1024:.1f} KB gambar")
+
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("⬅ Sebelumnya", disabled=len(page_cursors) == 1, use_container_width=True):
+                page_cursors.pop()
+                st.rerun()
+        with col_page:
+            st.markdown(f"<p style='text-align: center;'>Halaman {len(page_cursors)}</p>", unsafe_allow_html=True)
+        with col_next:
+            if st.button("Berikutnya ➡", disabled=next_cursor is None, use_container_width=True):
+                page_cursors.append(next_cursor)
+                st.rerun()
     else:
         st.info("ℹ Belum ada riwayat deteksi.")
 
@@ -419,19 +582,23 @@ def statistics_page():
     
     conn = get_connection()
     if conn:
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT label, confidence FROM detections WHERE email = %s", (st.session_state["email"],))
-        results = cursor.fetchall()
-        conn.close()
+        try:
+            stats = get_stats(conn, st.session_state["email"])
+        except mysql.connector.Error as err:
+            st.error(f"❌ Error mengambil statistik: {err}")
+            return
+        finally:
+            conn.close()
         
-        if results:
-            df = pd.DataFrame(results)
+        if stats["total"]:
+            df = pd.DataFrame(stats["labels"])
             
             with st.container():
                 st.subheader("Distribusi Deteksi")
                 fig = px.pie(
                     df,
                     names="label",
+                    values="count",
                     title="Distribusi Kategori Kerusakan",
                     color_discrete_sequence=px.colors.qualitative.Pastel,
                     height=500
@@ -440,14 +607,14 @@ def statistics_page():
                 st.plotly_chart(fig, use_container_width=True)
 
                 st.subheader("Rata-rata Tingkat Kepercayaan per Kategori")
-                avg_confidence = df.groupby('label')['confidence'].mean().reset_index()
                 fig = px.bar(
-                    avg_confidence,
+                    df,
                     x='label',
-                    y='confidence',
+                    y='mean_confidence',
                     title='Rata-rata Tingkat Kepercayaan per Kategori',
                     color='label',
                     color_discrete_sequence=px.colors.qualitative.Set2,
+                    labels={'mean_confidence': 'confidence'},
                     height=600
                 )
                 fig.update_traces(texttemplate='%{y:.1f}%', textposition='outside')
@@ -458,16 +625,13 @@ def statistics_page():
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
-                    total_detections = len(df)
-                    st.metric("Total Deteksi", total_detections)
+                    st.metric("Total Deteksi", stats["total"])
                 
                 with col2:
-                    avg_confidence_total = df['confidence'].mean()
-                    st.metric("Rata-rata Kepercayaan", f"{avg_confidence_total:.1f}%")
+                    st.metric("Rata-rata Kepercayaan", f"{stats['mean_confidence']:.1f}%")
                 
                 with col3:
-                    most_common = df['label'].mode()[0]
-                    st.metric("Kategori Terbanyak", most_common)
+                    st.metric("Kategori Terbanyak", stats["most_common"])
         else:
             st.info("ℹ Belum ada data untuk ditampilkan.")
     else:
@@ -570,6 +734,7 @@ def main_app(model):
     elif selected == "🚪 Logout":
         st.session_state["logged_in"] = False
         st.session_state["email"] = None
+        st.session_state.pop("history_cursors", None)
         st.rerun()
 
 # Load model
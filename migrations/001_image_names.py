@@ -0,0 +1,64 @@
+"""Migrasi nama gambar lama ke skema naming.py dan tambahkan indeks UNIQUE.
+
+Nama lama berbentuk ``img_<nomor>`` (main.py) atau ``img_<hash8>.png`` (app.py)
+dan bisa duplikat karena race saat penyimpanan bersamaan. Setiap baris lama
+diberi nama baru yang terurut sesuai kolom ``timestamp``; bagian acaknya
+diturunkan dari ``id`` sehingga migrasi aman dijalankan ulang.
+
+    python migrations/001_image_names.py [--dry-run] [--chunk-size 1000]
+"""
+import argparse
+import os
+import sys
+from hashlib import sha256
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db  # noqa: E402
+from naming import encode_id, is_generated_name  # noqa: E402
+
+
+# Nama deterministik untuk baris lama: waktu dari kolom timestamp, 80 bit dari hash id
+def legacy_image_name(row_id, timestamp):
+    random_part = int.from_bytes(sha256(f"detections:{row_id}".encode()).digest()[:10], "big")
+    return f"img_{encode_id(int(timestamp.timestamp() * 1000), random_part)}"
+
+
+def run(dry_run, chunk_size):
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT id, timestamp, image_name FROM detections ORDER BY id")
+        updates = [
+            (legacy_image_name(row_id, timestamp), row_id)
+            for row_id, timestamp, image_name in cursor.fetchall()
+            if not is_generated_name(image_name)
+        ]
+        print(f"{len(updates)} baris perlu diganti namanya")
+
+        if not dry_run:
+            for start in range(0, len(updates), chunk_size):
+                cursor.executemany("UPDATE detections SET image_name = %s WHERE id = %s", updates[start:start + chunk_size])
+                conn.commit()
+                print(f"  {min(start + chunk_size, len(updates))}/{len(updates)} baris diperbarui")
+
+        cursor.execute(
+            """
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = 'detections' AND index_name = 'uniq_image_name'
+            """
+        )
+        if cursor.fetchone()[0] == 0:
+            print("Menambahkan indeks UNIQUE uniq_image_name")
+            if not dry_run:
+                cursor.execute("ALTER TABLE detections ADD UNIQUE KEY uniq_image_name (image_name)")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.dry_run, args.chunk_size)
@@ -0,0 +1,86 @@
+"""Pindahkan isi kolom detections.image_data ke blob store (lihat blob_store.py).
+
+Menambahkan kolom ``image_hash`` bila belum ada, lalu membaca blob lama per
+chunk (keyset pada ``id``) sehingga memori tetap kecil walau tabelnya besar.
+Setiap blob ditulis ke store, ``image_hash`` diisi, dan ``image_data``
+dikosongkan dalam transaksi per chunk. Aman dijalankan ulang.
+
+    python migrations/002_blob_store.py [--chunk-size 100] [--keep-data] [--optimize]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db  # noqa: E402
+from blob_store import get_blob_store  # noqa: E402
+
+
+def column_exists(cursor, table, column):
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        """,
+        (table, column)
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def run(chunk_size, keep_data, optimize):
+    store = get_blob_store()
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    try:
+        if not column_exists(cursor, "detections", "image_hash"):
+            print("Menambahkan kolom image_hash")
+            cursor.execute("ALTER TABLE detections ADD COLUMN image_hash char(64) DEFAULT NULL AFTER image_data, ADD KEY idx_image_hash (image_hash)")
+
+        last_id = 0
+        moved = 0
+        stored_bytes = 0
+        while True:
+            cursor.execute(
+                """
+                SELECT id, image_data FROM detections
+                WHERE id > %s AND image_data IS NOT NULL AND image_hash IS NULL
+                ORDER BY id LIMIT %s
+                """,
+                (last_id, chunk_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            updates = []
+            for row_id, image_data in rows:
+                updates.append((store.put(bytes(image_data)), row_id))
+                stored_bytes += len(image_data)
+            if keep_data:
+                cursor.executemany("UPDATE detections SET image_hash = %s WHERE id = %s", updates)
+            else:
+                cursor.executemany("UPDATE detections SET image_hash = %s, image_data = NULL WHERE id = %s", updates)
+            conn.commit()
+
+            last_id = rows[-1][0]
+            moved += len(rows)
+            print(f"  {moved} blob dipindahkan ({stored_bytes / 1e6:.1f} MB), id terakhir {last_id}")
+
+        print(f"Selesai: {moved} blob dipindahkan ke {store.root}")
+        if optimize and not keep_data:
+            # Kembalikan ruang LONGBLOB yang sudah kosong ke tablespace
+            print("Menjalankan OPTIMIZE TABLE detections")
+            cursor.execute("OPTIMIZE TABLE detections")
+            cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--keep-data", action="store_true", help="Isi image_hash tanpa mengosongkan image_data")
+    parser.add_argument("--optimize", action="store_true", help="Jalankan OPTIMIZE TABLE setelah migrasi")
+    args = parser.parse_args()
+    run(args.chunk_size, args.keep_data, args.optimize)
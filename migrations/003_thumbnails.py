@@ -0,0 +1,92 @@
+"""Buat thumbnail riwayat (preprocessing.make_thumbnail) untuk baris lama.
+
+Menambahkan kolom ``thumbnail`` bila belum ada, lalu memproses baris tanpa
+thumbnail per chunk (keyset pada ``id``). Gambar sumber diambil dari blob store
+bila ``image_hash`` terisi, atau dari kolom ``image_data`` untuk baris yang
+belum dimigrasi oleh 002_blob_store.py. Aman dijalankan ulang.
+
+    python migrations/003_thumbnails.py [--chunk-size 100]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db  # noqa: E402
+from blob_store import get_blob_store  # noqa: E402
+from preprocessing import make_thumbnail  # noqa: E402
+
+
+def column_exists(cursor, table, column):
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        """,
+        (table, column)
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def load_source(store, image_hash, image_data):
+    if image_hash:
+        try:
+            return store.get(image_hash)
+        except KeyError:
+            return None
+    return bytes(image_data) if image_data else None
+
+
+def run(chunk_size):
+    store = get_blob_store()
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    try:
+        if not column_exists(cursor, "detections", "thumbnail"):
+            print("Menambahkan kolom thumbnail")
+            cursor.execute("ALTER TABLE detections ADD COLUMN thumbnail blob DEFAULT NULL AFTER image_hash")
+
+        last_id = 0
+        created = 0
+        skipped = 0
+        while True:
+            cursor.execute(
+                """
+                SELECT id, image_hash, image_data FROM detections
+                WHERE id > %s AND thumbnail IS NULL
+                ORDER BY id LIMIT %s
+                """,
+                (last_id, chunk_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            updates = []
+            for row_id, image_hash, image_data in rows:
+                source = load_source(store, image_hash, image_data)
+                try:
+                    updates.append((make_thumbnail(source), row_id))
+                except Exception as e:
+                    if source is not None:
+                        print(f"  id {row_id}: gagal membuat thumbnail ({e})")
+                    skipped += 1
+            if updates:
+                cursor.executemany("UPDATE detections SET thumbnail = %s WHERE id = %s", updates)
+                conn.commit()
+
+            last_id = rows[-1][0]
+            created += len(updates)
+            print(f"  {created} thumbnail dibuat, id terakhir {last_id}")
+
+        print(f"Selesai: {created} thumbnail dibuat, {skipped} baris tanpa gambar dilewati")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, default=100)
+    args = parser.parse_args()
+    run(args.chunk_size)
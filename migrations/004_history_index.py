@@ -0,0 +1,64 @@
+"""Tambahkan indeks komposit (email, timestamp, id) untuk riwayat deteksi.
+
+Riwayat dipaginasi dengan keyset pada kolom-kolom ini (pagination.py). Tanpa
+indeks ini setiap halaman adalah full scan + filesort atas tabel detections.
+Indeks dibuat online (ALGORITHM=INPLACE, LOCK=NONE); aman dijalankan ulang.
+
+    python migrations/004_history_index.py [--dry-run]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db  # noqa: E402
+
+INDEX_NAME = "idx_email_timestamp_id"
+
+
+def index_exists(cursor, table, index):
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """,
+        (table, index)
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def run(dry_run):
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    try:
+        if index_exists(cursor, "detections", INDEX_NAME):
+            print(f"Indeks {INDEX_NAME} sudah ada")
+        elif dry_run:
+            print(f"Indeks {INDEX_NAME} akan dibuat")
+        else:
+            print(f"Membuat indeks {INDEX_NAME}")
+            cursor.execute(
+                f"ALTER TABLE detections ADD KEY {INDEX_NAME} (email, timestamp, id), "
+                "ALGORITHM=INPLACE, LOCK=NONE"
+            )
+
+        # Pastikan query halaman riwayat benar-benar memakai indeks
+        cursor.execute(
+            "EXPLAIN SELECT id FROM detections WHERE email = %s "
+            "ORDER BY timestamp DESC, id DESC LIMIT 21",
+            ("",)
+        )
+        columns = [column[0] for column in cursor.description]
+        for row in cursor.fetchall():
+            plan = dict(zip(columns, row))
+            print(f"EXPLAIN: key={plan.get('key')}, Extra={plan.get('Extra')}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    run(args.dry_run)
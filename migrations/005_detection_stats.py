@@ -0,0 +1,47 @@
+"""Buat tabel rollup detection_stats dan isi dari tabel detections.
+
+Setelah migrasi ini app.py, app_async.py, dan main.py memperbarui rollup pada
+setiap insert. Jalankan saat tidak ada penyimpanan deteksi yang berjalan, atau
+jalankan ``python detection_stats.py check`` sesudahnya dan rebuild bila perlu.
+Aman dijalankan ulang.
+
+    python migrations/005_detection_stats.py
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db  # noqa: E402
+from detection_stats import check_consistency, rebuild  # noqa: E402
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS detection_stats (
+      email varchar(255) NOT NULL,
+      label varchar(255) NOT NULL,
+      count int(11) NOT NULL DEFAULT 0,
+      confidence_sum double NOT NULL DEFAULT 0,
+      confidence_sq_sum double NOT NULL DEFAULT 0,
+      PRIMARY KEY (email, label)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+"""
+
+
+def run():
+    conn = db.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(CREATE_TABLE)
+        cursor.close()
+
+        print(f"Rollup dibangun: {rebuild(conn)} baris")
+        mismatches = check_consistency(conn)
+        print(f"Pemeriksaan konsistensi: {len(mismatches)} selisih")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+    run()
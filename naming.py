@@ -0,0 +1,52 @@
+import os
+import threading
+import time
+
+# Alfabet Crockford base32 (tanpa I, L, O, U) sehingga nama tetap terurut secara leksikografis
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+
+# Encode timestamp (ms, 48 bit) dan bagian acak (80 bit) menjadi 26 karakter
+def encode_id(timestamp_ms, random_part):
+    value = (timestamp_ms << _RANDOM_BITS) | random_part
+    chars = []
+    for _ in range(26):
+        chars.append(_ALPHABET[value & 0x1F])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+# ID unik yang terurut waktu (format ULID). Tidak perlu query ke tabel: keunikan
+# antar proses dijamin 80 bit acak, dan di dalam satu proses ID dalam milidetik
+# yang sama dinaikkan satu per satu sehingga tetap monoton.
+def new_image_id():
+    global _last_ms, _last_random
+    with _lock:
+        now_ms = int(time.time() * 1000)
+        if now_ms <= _last_ms:
+            now_ms = _last_ms
+            random_part = (_last_random + 1) & ((1 << _RANDOM_BITS) - 1)
+        else:
+            random_part = int.from_bytes(os.urandom(_RANDOM_BITS // 8), "big")
+        _last_ms, _last_random = now_ms, random_part
+    return encode_id(now_ms, random_part)
+
+
+# Nama gambar untuk kolom detections.image_name
+def generate_image_name():
+    return f"img_{new_image_id()}"
+
+
+# Cek apakah nama gambar sudah memakai skema ini
+def is_generated_name(image_name):
+    return (
+        image_name is not None
+        and len(image_name) == 30
+        and image_name.startswith("img_")
+        and all(char in _ALPHABET for char in image_name[4:])
+    )
@@ -0,0 +1,77 @@
+import base64
+import datetime
+import os
+from urllib.parse import urlencode
+
+# Jumlah riwayat per halaman (default) dan batas atas parameter `limit`
+HISTORY_PAGE_SIZE = int(os.environ.get("HISTORY_PAGE_SIZE", 20))
+HISTORY_MAX_PAGE_SIZE = int(os.environ.get("HISTORY_MAX_PAGE_SIZE", 100))
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+# Cursor berisi (timestamp, id) baris terakhir pada halaman sebelumnya,
+# dikodekan base64 agar klien memperlakukannya sebagai token
+def encode_cursor(timestamp, row_id):
+    if isinstance(timestamp, datetime.datetime):
+        timestamp = timestamp.strftime(TIMESTAMP_FORMAT)
+    raw = f"{timestamp}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+# Kebalikan encode_cursor; ValueError bila cursor tidak valid
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, row_id = raw.split("|")
+        return datetime.datetime.strptime(timestamp, TIMESTAMP_FORMAT), int(row_id)
+    except ValueError:
+        raise ValueError("Cursor tidak valid") from None
+
+
+# Baca parameter `limit`; dibatasi HISTORY_MAX_PAGE_SIZE
+def parse_limit(value, default=HISTORY_PAGE_SIZE):
+    if value is None or value == "":
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        raise ValueError("limit harus berupa bilangan bulat positif")
+    return min(limit, HISTORY_MAX_PAGE_SIZE)
+
+
+# Query satu halaman riwayat dengan keyset pagination pada (email, timestamp, id).
+# Dengan indeks idx_email_timestamp_id, MySQL langsung melompat ke posisi cursor
+# sehingga waktu respons tidak bergantung pada jumlah riwayat atau nomor halaman.
+# Diambil satu baris lebih untuk mengetahui apakah masih ada halaman berikutnya.
+def history_query(columns, email, limit, cursor=None):
+    query = f"SELECT {columns} FROM detections WHERE email = %s"
+    params = [email]
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        # Batas `timestamp <= %s` membuat kondisi bisa langsung mencari posisi di indeks
+        query += " AND timestamp <= %s AND (timestamp < %s OR id < %s)"
+        params += [timestamp, timestamp, row_id]
+    query += " ORDER BY timestamp DESC, id DESC LIMIT %s"
+    params.append(limit + 1)
+    return query, tuple(params)
+
+
+# Pisahkan hasil history_query menjadi baris halaman ini dan cursor halaman berikutnya
+def split_page(rows, limit):
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last["timestamp"], last["id"])
+
+
+# Header respons /history untuk halaman berikutnya. Body tetap berupa list
+# riwayat seperti sebelumnya; cursor dikirim lewat X-Next-Cursor dan Link (RFC 8288).
+def next_page_headers(base_url, email, limit, next_cursor):
+    if next_cursor is None:
+        return {}
+    query = urlencode({"email": email, "limit": limit, "cursor": next_cursor})
+    return {"X-Next-Cursor": next_cursor, "Link": f'<{base_url}?{query}>; rel="next"'}
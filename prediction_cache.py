@@ -0,0 +1,137 @@
+import os
+import threading
+import logging
+from collections import OrderedDict
+from hashlib import sha256
+
+
+# Versi model dihitung dari isi file model, sehingga cache otomatis tidak berlaku
+# lagi ketika model dilatih ulang
+def model_version(model_path):
+    try:
+        digest = sha256()
+        with open(model_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()[:16]
+    except OSError:
+        return "unknown"
+
+
+# Cache hasil prediksi berdasarkan hash SHA-256 isi gambar dan versi model.
+# Tingkat pertama berupa LRU di memori, tingkat kedua (opsional) berupa tabel
+# `prediction_cache` di database yang diakses melalui `get_connection`.
+class PredictionCache:
+    def __init__(self, model_version, max_entries=4096, get_connection=None):
+        self.model_version = model_version
+        self.max_entries = max_entries
+        self.get_connection = get_connection
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Kunci cache: hash gambar digabung dengan versi model
+    def make_key(self, image_data):
+        return sha256(image_data).hexdigest() + ":" + self.model_version
+
+    # Ambil hasil (indeks label, confidence) atau None jika tidak ada
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._db_get(key)
+        with self._lock:
+            if value is not None:
+                self.db_hits += 1
+                self._store(key, value)
+            else:
+                self.misses += 1
+        return value
+
+    # Simpan hasil prediksi ke memori dan database
+    def put(self, key, label_index, confidence):
+        value = (int(label_index), float(confidence))
+        with self._lock:
+            self._store(key, value)
+        self._db_put(key, value)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.db_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.db_hits) / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _db_get(self, key):
+        if self.get_connection is None:
+            return None
+        conn = self.get_connection()
+        if conn is None:
+            return None
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT label_index, confidence FROM prediction_cache WHERE cache_key = %s", (key,))
+            row = cursor.fetchone()
+            return (int(row[0]), float(row[1])) if row else None
+        except Exception as e:
+            logging.error(f"Error membaca cache prediksi: {e}")
+            return None
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _db_put(self, key, value):
+        if self.get_connection is None:
+            return
+        conn = self.get_connection()
+        if conn is None:
+            return
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                INSERT INTO prediction_cache (cache_key, label_index, confidence)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE label_index = VALUES(label_index), confidence = VALUES(confidence)
+                """,
+                (key, value[0], value[1])
+            )
+            conn.commit()
+        except Exception as e:
+            logging.error(f"Error menyimpan cache prediksi: {e}")
+        finally:
+            cursor.close()
+            conn.close()
+
+
+# Konfigurasi cache dari environment variable
+def cache_settings():
+    return {
+        "max_entries": int(os.environ.get("PREDICTION_CACHE_SIZE", 4096)),
+        "persist": os.environ.get("PREDICTION_CACHE_PERSIST", "0") == "1",
+    }
@@ -0,0 +1,56 @@
+from PIL import Image, ImageOps
+import numpy as np
+import io
+
+# Ukuran input model MobileNetV2
+IMG_SIZE = (128, 128)
+
+# Faktor ukuran draft terhadap target. Decode JPEG di domain DCT hanya bisa
+# memperkecil dengan skala 1/2, 1/4, 1/8, jadi kita minta minimal 2x target agar
+# resize akhir tetap punya cukup piksel untuk anti-aliasing.
+DRAFT_FACTOR = 2
+
+# Ukuran maksimum thumbnail untuk halaman riwayat (rasio aspek dipertahankan)
+THUMBNAIL_SIZE = (160, 160)
+THUMBNAIL_QUALITY = 80
+
+
+# Fungsi menyiapkan gambar PIL yang belum di-decode menjadi RGB ukuran target.
+# `draft` hanya berpengaruh pada JPEG yang belum dimuat; format lain tetap
+# didecode penuh.
+def prepare_image(img, size=IMG_SIZE):
+    if img.format == "JPEG":
+        img.draft("RGB", (size[0] * DRAFT_FACTOR, size[1] * DRAFT_FACTOR))
+    img = ImageOps.exif_transpose(img)
+    if img.mode != "RGB":
+        # Sama dengan load_img Keras saat pelatihan: kanal alpha dibuang,
+        # grayscale/palet diperluas menjadi tiga kanal
+        img = img.convert("RGB")
+    return img.resize(size)
+
+
+# Fungsi membuka gambar dari path atau file-like object dan menyiapkannya
+def load_image(source, size=IMG_SIZE):
+    with Image.open(source) as img:
+        return prepare_image(img, size)
+
+
+# Fungsi mengubah gambar siap pakai menjadi array uint8 (tinggi, lebar, 3)
+def image_to_array(img):
+    return np.asarray(img, dtype=np.uint8)
+
+
+# Fungsi membuat thumbnail JPEG kecil dari bytes gambar. Dibuat sekali saat
+# hasil deteksi disimpan sehingga halaman riwayat tidak perlu mengambil dan
+# men-decode gambar ukuran penuh.
+def make_thumbnail(image_data, size=THUMBNAIL_SIZE, quality=THUMBNAIL_QUALITY):
+    with Image.open(io.BytesIO(image_data)) as img:
+        if img.format == "JPEG":
+            img.draft("RGB", size)
+        img = ImageOps.exif_transpose(img)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail(size)
+        output = io.BytesIO()
+        img.save(output, format="JPEG", quality=quality, optimize=True)
+    return output.getvalue()
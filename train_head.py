@@ -0,0 +1,226 @@
+"""Latih kepala klasifikasi di atas fitur MobileNetV2 beku yang sudah di-cache.
+
+Gambar dibaca dari shard uint8 yang sudah di-decode (dataset_shards.py).
+Backbone beku hanya dijalankan sekali per gambar (dan per varian augmentasi),
+lalu vektor fitur hasil GlobalAveragePooling2D disimpan sebagai array NumPy
+memory-mapped. Kepala Dense(128) -> Dense(num_classes) dilatih di atas fitur
+tersebut dan bobotnya dimasukkan kembali ke model penuh, yang disimpan sebagai
+.h5 dengan arsitektur yang sama seperti klasifikasi_rumah_rusak.py. Model yang
+dipakai app.py dan main.py hanya diganti bila --deploy diberikan.
+
+    python train_head.py [--shards dataset_shards] [--epochs 25] [--variants 5] [--baseline] [--deploy]
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from hashlib import sha256
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.applications import MobileNetV2
+from tensorflow.keras.layers import Dense, Dropout, GlobalAveragePooling2D, Input
+from tensorflow.keras.models import Sequential
+
+from dataset_shards import SHARD_DIR, ShardStore
+from training_data import BATCH_SIZE, IMG_SIZE, dataset_from_shards
+
+FEATURE_DIM = 1280
+CACHE_VERSION = 1
+# Model yang dimuat app.py dan main.py
+DEPLOYED_MODEL_PATH = os.path.join("model", "model_klasifikasirumah.h5")
+
+
+def build_backbone():
+    base_model = MobileNetV2(weights="imagenet", include_top=False, input_shape=(*IMG_SIZE, 3))
+    base_model.trainable = False
+    return base_model
+
+
+# Arsitektur yang sama dengan klasifikasi_rumah_rusak.py
+def build_full_model(base_model, num_classes):
+    model = Sequential([
+        base_model,
+        GlobalAveragePooling2D(),
+        Dropout(0.5),
+        Dense(128, activation='relu'),
+        Dropout(0.3),
+        Dense(num_classes, activation='softmax')
+    ])
+    model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
+    return model
+
+
+# Bagian model penuh setelah GlobalAveragePooling2D, dengan input vektor fitur
+def build_head(num_classes):
+    head = Sequential([
+        Input((FEATURE_DIM,)),
+        Dropout(0.5),
+        Dense(128, activation='relu'),
+        Dropout(0.3),
+        Dense(num_classes, activation='softmax')
+    ])
+    head.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
+    return head
+
+
+# Salin bobot lapisan Dense kepala ke model penuh (urutan lapisan sama)
+def load_head_weights(full_model, head):
+    targets = [layer for layer in full_model.layers if isinstance(layer, Dense)]
+    sources = [layer for layer in head.layers if isinstance(layer, Dense)]
+    for target, source in zip(targets, sources, strict=True):
+        target.set_weights(source.get_weights())
+
+
+# Kunci cache: hash isi dan kelas setiap gambar split, jumlah varian, dan backbone
+def cache_key(entries, variants, augment):
+    digest = sha256(f"v{CACHE_VERSION}:mobilenetv2-imagenet:{IMG_SIZE}:{variants}:{augment}".encode())
+    for row in entries:
+        digest.update(f"{row['sha256']}:{row['class']}\n".encode())
+    return digest.hexdigest()
+
+
+# Fitur (memmap, baca saja) dan label untuk satu split. Setiap varian adalah
+# satu lintasan penuh backbone atas semua gambar dengan augmentasi acak baru;
+# cache dipakai ulang selama isi split dan pengaturannya tidak berubah.
+def cached_features(backbone, store, split, cache_dir, variants=1, augment=False):
+    os.makedirs(cache_dir, exist_ok=True)
+    features_path = os.path.join(cache_dir, f"{split}.features.npy")
+    labels_path = os.path.join(cache_dir, f"{split}.labels.npy")
+    meta_path = os.path.join(cache_dir, f"{split}.json")
+    key = cache_key(store.entries(split), variants, augment)
+
+    if os.path.exists(meta_path) and os.path.exists(features_path) and os.path.exists(labels_path):
+        with open(meta_path) as f:
+            if json.load(f).get("key") == key:
+                return np.load(features_path, mmap_mode="r"), np.load(labels_path), 0.0
+
+    start = time.perf_counter()
+    dataset, labels, _ = dataset_from_shards(split, augment=augment, store=store)
+    features = np.lib.format.open_memmap(
+        features_path, mode="w+", dtype=np.float32, shape=(len(labels) * variants, FEATURE_DIM)
+    )
+    extractor = tf.function(lambda images: tf.reduce_mean(backbone(images, training=False), axis=[1, 2]))
+    offset = 0
+    for _ in range(variants):
+        for images, _ in dataset:
+            batch = extractor(images).numpy()
+            features[offset:offset + len(batch)] = batch
+            offset += len(batch)
+    features.flush()
+    del features
+
+    np.save(labels_path, np.tile(np.asarray(labels, dtype=np.int32), variants))
+    with open(meta_path, "w") as f:
+        json.dump({"key": key, "count": len(labels), "variants": variants}, f)
+    elapsed = time.perf_counter() - start
+    return np.load(features_path, mmap_mode="r"), np.load(labels_path), elapsed
+
+
+# Batch acak dari fitur memmap tanpa memuat seluruh array ke memori
+def feature_batches(features, labels, num_classes, batch_size=BATCH_SIZE):
+    one_hot = np.eye(num_classes, dtype=np.float32)
+    while True:
+        order = np.random.permutation(len(labels))
+        for start in range(0, len(order), batch_size):
+            index = np.sort(order[start:start + batch_size])
+            yield np.asarray(features[index]), one_hot[labels[index]]
+
+
+def evaluate(model, store):
+    dataset, labels, _ = dataset_from_shards("test", store=store)
+    predictions = np.argmax(model.predict(dataset, verbose=0), axis=1)
+    return float((predictions == np.asarray(labels)).mean())
+
+
+# Pelatihan saat ini: backbone dijalankan ulang setiap langkah selama semua epoch
+def train_baseline(store, epochs):
+    start = time.perf_counter()
+    model = build_full_model(build_backbone(), len(store.class_names))
+    model.fit(
+        dataset_from_shards("train", augment=True, shuffle=True, store=store)[0],
+        validation_data=dataset_from_shards("val", augment=True, store=store)[0],
+        epochs=epochs,
+        verbose=2
+    )
+    return model, time.perf_counter() - start
+
+
+def run(shard_dir, epochs, variants, cache_dir, output, report_path, baseline, deploy=False):
+    store = ShardStore(shard_dir)
+    class_names = store.class_names
+    num_classes = len(class_names)
+    report = {"classes": class_names, "epochs": epochs, "variants": variants}
+
+    start = time.perf_counter()
+    backbone = build_backbone()
+    train_x, train_y, train_extract = cached_features(backbone, store, "train", cache_dir, variants, augment=True)
+    val_x, val_y, val_extract = cached_features(backbone, store, "val", cache_dir)
+
+    head_start = time.perf_counter()
+    head = build_head(num_classes)
+    # Satu epoch = satu lintasan atas semua gambar, seperti pelatihan penuh;
+    # setiap epoch mengambil sampel acak dari fitur semua varian
+    steps = int(np.ceil(len(store.entries("train")) / BATCH_SIZE))
+    head.fit(
+        feature_batches(train_x, train_y, num_classes),
+        validation_data=(np.asarray(val_x), np.eye(num_classes, dtype=np.float32)[val_y]),
+        steps_per_epoch=steps,
+        epochs=epochs,
+        verbose=2
+    )
+    head_elapsed = time.perf_counter() - head_start
+
+    full_model = build_full_model(backbone, num_classes)
+    load_head_weights(full_model, head)
+    total = time.perf_counter() - start
+    report["cached_head"] = {
+        "feature_extraction_s": train_extract + val_extract,
+        "head_training_s": head_elapsed,
+        "total_s": total,
+        "test_accuracy": evaluate(full_model, store),
+    }
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    full_model.save(output)
+    print(f"Model disimpan di {output}")
+    if deploy and os.path.abspath(output) != os.path.abspath(DEPLOYED_MODEL_PATH):
+        shutil.copyfile(output, DEPLOYED_MODEL_PATH)
+        print(f"Model yang di-deploy diganti: {DEPLOYED_MODEL_PATH}")
+
+    if baseline:
+        baseline_model, baseline_elapsed = train_baseline(store, epochs)
+        report["baseline"] = {
+            "total_s": baseline_elapsed,
+            "test_accuracy": evaluate(baseline_model, store),
+        }
+        report["speedup"] = baseline_elapsed / total
+
+    for name in ("cached_head", "baseline"):
+        if name in report:
+            result = report[name]
+            print(f"{name:>12}: {result['total_s']:8.1f} s, akurasi test {result['test_accuracy'] * 100:.2f}%")
+    if "speedup" in report:
+        print(f"Percepatan: {report['speedup']:.1f}x")
+
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Laporan disimpan di {report_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shards", default=SHARD_DIR)
+    parser.add_argument("--epochs", type=int, default=25)
+    parser.add_argument("--variants", type=int, default=5, help="Jumlah varian augmentasi per gambar train")
+    parser.add_argument("--cache-dir", default="feature_cache")
+    parser.add_argument("--output", default=os.path.join("model", "model_klasifikasirumah_head.h5"))
+    parser.add_argument("--report", default=os.path.join("model", "head_training_report.json"))
+    parser.add_argument("--baseline", action="store_true", help="Ukur juga pelatihan penuh saat ini")
+    parser.add_argument("--deploy", action="store_true", help=f"Ganti model yang dipakai aplikasi ({DEPLOYED_MODEL_PATH})")
+    args = parser.parse_args()
+    # Model aplikasi hanya boleh ditimpa secara eksplisit
+    if os.path.abspath(args.output) == os.path.abspath(DEPLOYED_MODEL_PATH) and not args.deploy:
+        parser.error("--output menunjuk ke model yang di-deploy; tambahkan --deploy untuk menggantinya")
+    run(args.shards, args.epochs, args.variants, args.cache_dir, args.output, args.report, args.baseline, args.deploy)
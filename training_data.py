@@ -0,0 +1,106 @@
+"""Pipeline input pelatihan berbasis tf.data (pengganti ImageDataGenerator).
+
+Gambar uint8 128x128 dibaca per batch dari shard yang sudah di-decode (lihat
+dataset_shards.py), lalu augmentasi dijalankan per batch sebagai satu
+transformasi affine tervektorisasi. Parameter augmentasi sama dengan
+ImageDataGenerator di klasifikasi_rumah_rusak.py.
+"""
+import math
+
+import tensorflow as tf
+
+from dataset_shards import IMG_SIZE, SHARD_DIR, ShardStore
+
+BATCH_SIZE = 32
+
+# Sama dengan ImageDataGenerator(rotation_range=30, width_shift_range=0.2,
+# height_shift_range=0.2, shear_range=0.2, zoom_range=0.2, horizontal_flip=True,
+# fill_mode="nearest"). Seperti Keras, shear_range dalam derajat.
+AUGMENTATION = {
+    "rotation_range": 30,
+    "width_shift_range": 0.2,
+    "height_shift_range": 0.2,
+    "shear_range": 0.2,
+    "zoom_range": 0.2,
+    "horizontal_flip": True,
+}
+
+
+def _matrix(rows):
+    return tf.stack([tf.stack(row, axis=-1) for row in rows], axis=-2)
+
+
+# Matriks affine acak per gambar (batch, 3, 3), dibangun dengan urutan yang sama
+# seperti apply_affine_transform Keras: rotasi @ geser @ shear @ zoom, dengan
+# pusat gambar sebagai titik asal. Matriks memetakan koordinat output ke input.
+def random_affine_matrices(batch_size, height, width, settings=AUGMENTATION):
+    def uniform(limit):
+        return tf.random.uniform([batch_size], -limit, limit)
+
+    zeros = tf.zeros([batch_size])
+    ones = tf.ones([batch_size])
+    theta = uniform(settings["rotation_range"]) * (math.pi / 180)
+    tx = uniform(settings["height_shift_range"]) * height
+    ty = uniform(settings["width_shift_range"]) * width
+    shear = uniform(settings["shear_range"]) * (math.pi / 180)
+    zoom = settings["zoom_range"]
+    zx = tf.random.uniform([batch_size], 1 - zoom, 1 + zoom)
+    zy = tf.random.uniform([batch_size], 1 - zoom, 1 + zoom)
+
+    rotation = _matrix([[tf.cos(theta), -tf.sin(theta), zeros], [tf.sin(theta), tf.cos(theta), zeros], [zeros, zeros, ones]])
+    shift = _matrix([[ones, zeros, tx], [zeros, ones, ty], [zeros, zeros, ones]])
+    shear_matrix = _matrix([[ones, -tf.sin(shear), zeros], [zeros, tf.cos(shear), zeros], [zeros, zeros, ones]])
+    zoom_matrix = _matrix([[zx, zeros, zeros], [zeros, zy, zeros], [zeros, zeros, ones]])
+    transform = rotation @ shift @ shear_matrix @ zoom_matrix
+
+    center_x, center_y = (width - 1) / 2, (height - 1) / 2
+    to_center = _matrix([[ones, zeros, ones * center_x], [zeros, ones, ones * center_y], [zeros, zeros, ones]])
+    from_center = _matrix([[ones, zeros, ones * -center_x], [zeros, ones, ones * -center_y], [zeros, zeros, ones]])
+    return to_center @ transform @ from_center
+
+
+# Augmentasi satu batch uint8 (N, H, W, 3) sekaligus; hasil float32 [0, 1]
+# (rescale=1/255 dilakukan setelah transformasi, sama seperti ImageDataGenerator)
+def augment_batch(images, settings=AUGMENTATION):
+    images = tf.cast(images, tf.float32)
+    shape = tf.shape(images)
+    batch_size, height, width = shape[0], shape[1], shape[2]
+    matrices = random_affine_matrices(batch_size, tf.cast(height, tf.float32), tf.cast(width, tf.float32), settings)
+    images = tf.raw_ops.ImageProjectiveTransformV3(
+        images=images,
+        transforms=tf.reshape(matrices, [-1, 9])[:, :8],
+        output_shape=tf.stack([height, width]),
+        fill_value=0.0,
+        interpolation="BILINEAR",
+        fill_mode="NEAREST",
+    )
+    if settings["horizontal_flip"]:
+        flip = tf.random.uniform([batch_size]) < 0.5
+        images = tf.where(flip[:, None, None, None], tf.reverse(images, axis=[2]), images)
+    return images / 255.0
+
+
+# Dataset untuk satu split dari shard uint8 yang sudah di-decode (lihat
+# dataset_shards.py). Hanya indeks yang diacak dan di-batch; gambar satu batch
+# dibaca langsung dari memmap shard, tanpa decode dan tanpa cache di memori.
+# `store` bisa dipakai bersama beberapa split. Mengembalikan (dataset, label, nama kelas).
+def dataset_from_shards(split, shard_dir=SHARD_DIR, batch_size=BATCH_SIZE, augment=False, shuffle=False, seed=None,
+                        store=None):
+    store = store or ShardStore(shard_dir)
+    locations, labels = store.split(split)
+    dataset = tf.data.Dataset.from_tensor_slices((tf.range(len(labels), dtype=tf.int64), list(labels)))
+    if shuffle:
+        dataset = dataset.shuffle(len(labels), seed=seed, reshuffle_each_iteration=True)
+
+    def load(index, label):
+        images = tf.numpy_function(lambda index: store.gather(locations[index]), [index], tf.uint8)
+        images.set_shape([None, *store.image_size, 3])
+        return images, label
+
+    def finish(images, labels):
+        images = augment_batch(images) if augment else tf.cast(images, tf.float32) / 255.0
+        return images, tf.one_hot(labels, len(store.class_names))
+
+    dataset = dataset.batch(batch_size).map(load, num_parallel_calls=tf.data.AUTOTUNE)
+    dataset = dataset.map(finish, num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset.prefetch(tf.data.AUTOTUNE), labels, store.class_names
@@ -24,8 +24,13 @@ CREATE TABLE `detections` (
   `confidence` float NOT NULL,
   `timestamp` datetime NOT NULL,
   `image_data` longblob DEFAULT NULL,
+  `image_hash` char(64) DEFAULT NULL,
+  `thumbnail` blob DEFAULT NULL,
   `image_name` varchar(255) DEFAULT NULL,
-  PRIMARY KEY (`id`)
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uniq_image_name` (`image_name`),
+  KEY `idx_image_hash` (`image_hash`),
+  KEY `idx_email_timestamp_id` (`email`,`timestamp`,`id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
 -- --------------------------------------------------------
@@ -41,6 +46,32 @@ CREATE TABLE `users` (
 
 -- --------------------------------------------------------
 
+-- Table structure for table `detection_stats`
+-- Rollup per pengguna dan label, diperbarui setiap insert ke `detections`
+
+CREATE TABLE `detection_stats` (
+  `email` varchar(255) NOT NULL,
+  `label` varchar(255) NOT NULL,
+  `count` int(11) NOT NULL DEFAULT 0,
+  `confidence_sum` double NOT NULL DEFAULT 0,
+  `confidence_sq_sum` double NOT NULL DEFAULT 0,
+  PRIMARY KEY (`email`,`label`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
+-- Table structure for table `prediction_cache`
+
+CREATE TABLE `prediction_cache` (
+  `cache_key` varchar(96) NOT NULL,
+  `label_index` tinyint(4) NOT NULL,
+  `confidence` float NOT NULL,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  PRIMARY KEY (`cache_key`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- --------------------------------------------------------
+
 -- Set AUTO_INCREMENT values
 
 ALTER TABLE `detections` AUTO_INCREMENT = 90;
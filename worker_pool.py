@@ -0,0 +1,204 @@
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from inference import configured_runtime, create_engine, decode_predictions, runtime_model_path
+
+
+# Selang pemeriksaan proses worker yang mati (detik)
+HEALTH_CHECK_INTERVAL = 1.0
+
+
+# Loop utama setiap proses worker: muat model sendiri, lalu proses batch dari
+# antrean permintaan sampai menerima sinyal berhenti (None). Id permintaan yang
+# sedang diproses dicatat di `current[worker_id]` (memori bersama, langsung
+# terlihat) agar permintaan itu bisa digagalkan bila worker mati.
+def _worker_main(worker_id, model_path, labels, runtime, intra_op_threads, requests, results, current):
+    try:
+        if runtime == "keras":
+            import tensorflow as tf
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+            tf.config.threading.set_inter_op_parallelism_threads(1)
+            engine = create_engine(model_path, labels, runtime=runtime)
+        else:
+            engine = create_engine(model_path, labels, runtime=runtime, num_threads=intra_op_threads)
+    except Exception as e:
+        results.put(("failed", worker_id, str(e)))
+        return
+
+    results.put(("ready", worker_id, engine.timings))
+    while True:
+        item = requests.get()
+        if item is None:
+            break
+        request_id, images = item
+        current[worker_id] = request_id
+        try:
+            results.put(("result", request_id, engine.predict_proba(images)))
+        except Exception as e:
+            results.put(("error", request_id, str(e)))
+        current[worker_id] = -1
+
+
+# Pool N proses inferensi, masing-masing memegang model sendiri dengan jumlah
+# intra-op thread tertentu. Antarmukanya sama dengan InferenceEngine
+# (predict_proba/predict), ditambah submit() yang mengembalikan Future.
+class InferenceWorkerPool:
+    def __init__(self, model_path, labels, num_workers=2, intra_op_threads=1, runtime=None, start_timeout=300):
+        self.labels = list(labels)
+        self.runtime = runtime or configured_runtime()
+        self.model_path = runtime_model_path(model_path, self.runtime)
+        # Worker menerima path asli; create_engine memilih file sesuai runtime
+        self._source_model_path = model_path
+        self.num_workers = num_workers
+        self.intra_op_threads = intra_op_threads
+
+        # "spawn" agar setiap worker punya runtime TensorFlow yang bersih
+        self._context = multiprocessing.get_context("spawn")
+        self._requests = self._context.Queue()
+        self._results = self._context.Queue()
+        self._pending = {}
+        # Id permintaan yang sedang diproses tiap worker (-1 = menganggur)
+        self._current = self._context.Array("q", [-1] * num_workers, lock=False)
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count()
+        self._closing = False
+        self.restarts = 0
+
+        start = time.perf_counter()
+        self._processes = {worker_id: self._start_worker(worker_id) for worker_id in range(num_workers)}
+
+        self.timings = self._wait_until_ready(start_timeout)
+        self.timings["start_workers"] = time.perf_counter() - start
+        logging.info(f"{num_workers} worker inferensi siap ({intra_op_threads} intra-op thread per worker)")
+
+        self._dispatcher = threading.Thread(target=self._dispatch_results, name="worker-pool-results", daemon=True)
+        self._dispatcher.start()
+
+    def _start_worker(self, worker_id):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, self._source_model_path, self.labels, self.runtime, self.intra_op_threads,
+                  self._requests, self._results, self._current),
+            name=f"inference-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    # Tunggu semua worker selesai memuat model; gunakan durasi terlama per fase
+    def _wait_until_ready(self, timeout):
+        timings = {}
+        for _ in range(self.num_workers):
+            try:
+                status, worker_id, payload = self._results.get(timeout=timeout)
+            except queue.Empty:
+                self.close()
+                raise RuntimeError("Worker inferensi tidak siap dalam batas waktu")
+            if status == "failed":
+                self.close()
+                raise RuntimeError(f"Worker {worker_id} gagal memuat model: {payload}")
+            for phase, seconds in payload.items():
+                timings[phase] = max(timings.get(phase, 0.0), seconds)
+        return timings
+
+    def _dispatch_results(self):
+        while True:
+            try:
+                item = self._results.get(timeout=HEALTH_CHECK_INTERVAL)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if item is None:
+                break
+            status, key, payload = item
+            if status == "ready":
+                logging.info(f"Worker inferensi {key} siap kembali")
+                continue
+            if status == "failed":
+                # Worker pengganti gagal memuat model; worker ini tidak dijalankan lagi
+                logging.error(f"Worker inferensi {key} gagal memuat model: {payload}")
+                self._processes.pop(key, None)
+                self._check_workers()
+                continue
+            with self._pending_lock:
+                future = self._pending.pop(key, None)
+            if future is None:
+                continue
+            if status == "result":
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+            self._check_workers()
+
+    # Gagalkan permintaan milik worker yang mati (OOM, segfault) lalu jalankan
+    # worker pengganti. Bila tidak ada worker tersisa, semua permintaan digagalkan.
+    def _check_workers(self):
+        if self._closing:
+            return
+        for worker_id, process in list(self._processes.items()):
+            if process.is_alive():
+                continue
+            logging.error(f"Worker inferensi {worker_id} berhenti (exit code {process.exitcode}); dijalankan ulang")
+            request_id = self._current[worker_id]
+            self._current[worker_id] = -1
+            with self._pending_lock:
+                future = self._pending.pop(request_id, None)
+            if future is not None:
+                future.set_exception(RuntimeError(f"Worker inferensi {worker_id} berhenti saat memproses batch"))
+            self._processes[worker_id] = self._start_worker(worker_id)
+            self.restarts += 1
+
+        if not self._processes:
+            with self._pending_lock:
+                futures = list(self._pending.values())
+                self._pending.clear()
+            for future in futures:
+                future.set_exception(RuntimeError("Tidak ada worker inferensi yang berjalan"))
+
+    # Kirim batch uint8 (N, 128, 128, 3) ke worker; hasilnya berupa Future
+    def submit(self, images):
+        if self._closing or not self._processes:
+            raise RuntimeError("Tidak ada worker inferensi yang berjalan")
+        request_id = next(self._ids)
+        future = Future()
+        future.request_id = request_id
+        with self._pending_lock:
+            self._pending[request_id] = future
+        self._requests.put((request_id, images))
+        return future
+
+    # `timeout` membatasi waktu tunggu (detik) bila worker macet
+    def predict_proba(self, images, timeout=None):
+        future = self.submit(images)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            with self._pending_lock:
+                self._pending.pop(future.request_id, None)
+            raise TimeoutError(f"Prediksi worker melebihi batas waktu {timeout} detik")
+
+    def predict(self, images):
+        return decode_predictions(self.predict_proba(images), self.labels)
+
+    # Jumlah batch yang sedang menunggu atau diproses worker
+    def queue_depth(self):
+        with self._pending_lock:
+            return len(self._pending)
+
+    def close(self, timeout=10):
+        self._closing = True
+        for _ in self._processes:
+            self._requests.put(None)
+        for process in list(self._processes.values()):
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._results.put(None)
+        dispatcher = getattr(self, "_dispatcher", None)
+        if dispatcher is not None:
+            dispatcher.join(timeout)